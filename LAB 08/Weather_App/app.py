@@ -1,14 +1,19 @@
 import os
+import sys
 from dotenv import load_dotenv
 from flask import Flask, render_template, request
 import requests
 import datetime
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from request_metrics import RequestMetrics
+
 # Load environment variables from .env file
 load_dotenv()
 
 app = Flask(__name__)
+metrics = RequestMetrics(app)  # Prometheus metrics on /metrics
 
 # --- Configuration ---
 # Use the API_KEY or OPENWEATHER_API_KEY from .env
@@ -77,7 +82,8 @@ def index():
             if not WEATHER_API_KEY or WEATHER_API_KEY == "YOUR_OPENWEATHER_API_KEY_HERE":
                  return render_template('index.html', error="API Key is missing or default. Check your .env file.", current_unit=current_unit)
 
-            response = requests.get(WEATHER_API_URL, params=params)
+            with metrics.stage('openweather'):
+                response = requests.get(WEATHER_API_URL, params=params)
             response.raise_for_status() 
             
             weather_data = response.json()
@@ -26,7 +26,17 @@ class SentimentPredictor:
         return self.label_map[pred], prob
 
     def predict_batch(self, texts):
-        return [self.predict_single(t) for t in texts]
+        # One transform/predict_proba call for the whole batch instead of one per text
+        cleaned = [preprocess_text(t) for t in texts]
+        results = [('Neutral', 0.0)] * len(cleaned)
+        idx = [i for i, c in enumerate(cleaned) if c.strip()]
+        if idx:
+            vec = self.vectorizer.transform([cleaned[i] for i in idx])
+            probs = self.model.predict_proba(vec)
+            preds = self.model.classes_[probs.argmax(axis=1)]
+            for i, pred, prob in zip(idx, preds, probs.max(axis=1)):
+                results[i] = (self.label_map[pred], float(prob))
+        return results
 
 if __name__ == '__main__':
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
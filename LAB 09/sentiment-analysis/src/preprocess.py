@@ -27,9 +27,13 @@ def remove_special_characters(text):
 def remove_extra_whitespace(text):
     return re.sub(r'\s+', ' ', text).strip()
 
+_stop_words = None
+
 def remove_stopwords(tokens):
-    stop_words = set(stopwords.words('english'))
-    return [t for t in tokens if t not in stop_words]
+    global _stop_words
+    if _stop_words is None:
+        _stop_words = set(stopwords.words('english'))
+    return [t for t in tokens if t not in _stop_words]
 
 def tokenize(text):
     return text.split()
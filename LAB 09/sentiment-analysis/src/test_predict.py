@@ -6,3 +6,11 @@ vectorizer_path = os.path.join(root, 'models', 'vectorizer.pkl')
 sp = SentimentPredictor(model_path, vectorizer_path)
 print(sp.predict_single('I love this airline!'))
 print(sp.predict_single('This was the worst flight I have taken.'))
+
+# predict_batch must agree with predict_single, including texts that clean to nothing
+texts = ['I love this airline!', 'This was the worst flight I have taken.', 'ok', '', '!!!', '   ']
+for text, batch_result in zip(texts, sp.predict_batch(texts)):
+    single_result = sp.predict_single(text)
+    assert batch_result[0] == single_result[0], (text, batch_result, single_result)
+    assert abs(batch_result[1] - single_result[1]) < 1e-9, (text, batch_result, single_result)
+print('predict_batch matches predict_single on', len(texts), 'texts')
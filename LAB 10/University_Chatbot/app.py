@@ -1,9 +1,24 @@
 from flask import Flask, render_template, request, jsonify
 import os
+import sys
+import re
 import json
+import atexit
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+from request_metrics import RequestMetrics
+from sentiment_monitor import SentimentMonitor
+
 app = Flask(__name__)
+metrics = RequestMetrics(app)  # Prometheus metrics on /metrics
+
+# Messages are scored for sentiment in a background thread so /chat never waits on the model.
+# The worker starts on the first request, so under the debug reloader only the serving
+# process runs one (the watcher process never writes the stats file). The model loads
+# inside the worker thread, so no request waits for it.
+sentiment_monitor = SentimentMonitor(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sentiment_stats.json'))
+atexit.register(sentiment_monitor.stop)
 
 # Menu options and their responses
 MENU_OPTIONS = {
@@ -265,6 +280,36 @@ def load_university_data():
     except:
         return "University data not available"
 
+# Free-text keywords and the menu option they lead to, checked in this order
+MENU_KEYWORDS = {
+    'admissions': '1',
+    'admission': '1',
+    'contact': '2',
+    'programs': '3',
+    'academic': '3',
+    'campus': '4',
+    'facilities': '4',
+    'tuition': '5',
+    'fees': '5',
+    'financial': '5',
+    'aid': '5',
+    'student': '6',
+    'life': '6',
+    'about': '7',
+    'university': '7',
+}
+
+# Words almost every question contains: fine for picking a reply, too broad to tag a topic
+BROAD_KEYWORDS = {'about', 'university'}
+
+# Menu topic of a free-text message for sentiment tracking (whole words only)
+def get_menu_topic(user_input):
+    user_lower = user_input.lower()
+    for keyword, option in MENU_KEYWORDS.items():
+        if keyword not in BROAD_KEYWORDS and re.search(r'\b' + keyword + r'\b', user_lower):
+            return MENU_OPTIONS[option]['title']
+    return 'General'
+
 # Get menu display
 def get_menu_display():
     menu = "UNIVERSITY CHATBOT MENU\n\n"
@@ -296,21 +341,7 @@ def get_chatbot_response(user_input):
         'help': get_menu_display(),
         'hello': 'Hello! Welcome to our University Chatbot. Type "menu" to see options or ask any question!',
         'hi': 'Hi there! Type "menu" to see what information I can provide.',
-        'admissions': MENU_OPTIONS['1']['content'],
-        'admission': MENU_OPTIONS['1']['content'],
-        'contact': MENU_OPTIONS['2']['content'],
-        'programs': MENU_OPTIONS['3']['content'],
-        'academic': MENU_OPTIONS['3']['content'],
-        'campus': MENU_OPTIONS['4']['content'],
-        'facilities': MENU_OPTIONS['4']['content'],
-        'tuition': MENU_OPTIONS['5']['content'],
-        'fees': MENU_OPTIONS['5']['content'],
-        'financial': MENU_OPTIONS['5']['content'],
-        'aid': MENU_OPTIONS['5']['content'],
-        'student': MENU_OPTIONS['6']['content'],
-        'life': MENU_OPTIONS['6']['content'],
-        'about': MENU_OPTIONS['7']['content'],
-        'university': MENU_OPTIONS['7']['content'],
+        **{keyword: MENU_OPTIONS[option]['content'] for keyword, option in MENU_KEYWORDS.items()},
         'thanks': 'You\'re welcome! Feel free to ask me anything else. Type "menu" for options.',
         'thank you': 'Happy to help! Is there anything else? Type "menu" for options.',
         'bye': 'Goodbye! Have a wonderful day!',
@@ -325,6 +356,10 @@ def get_chatbot_response(user_input):
     # Default response
     return 'I didn\'t quite understand that. Type "menu" to see available options, or ask me about admissions, programs, campus, or contact information!'
 
+@app.before_request
+def start_sentiment_monitor():
+    sentiment_monitor.start()
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -337,7 +372,12 @@ def chat():
     if not user_message:
         return jsonify({'error': 'Empty message'}), 400
     
-    bot_response = get_chatbot_response(user_message)
+    with metrics.stage('reply_lookup'):
+        bot_response = get_chatbot_response(user_message)
+
+    # Bare menu numbers carry no sentiment; everything else is queued for scoring
+    if user_message.strip() not in MENU_OPTIONS:
+        sentiment_monitor.submit(get_menu_topic(user_message), user_message)
     
     return jsonify({
         'user_message': user_message,
@@ -349,5 +389,21 @@ def chat():
 def get_menu():
     return jsonify({'menu': get_menu_display()})
 
+@app.route('/sentiment-stats', methods=['GET'])
+def sentiment_stats():
+    return jsonify({'monitor': sentiment_monitor.stats(), 'topics': sentiment_monitor.topic_summary()})
+
+metrics.register_gauge('chatbot_sentiment_queue_depth', 'Messages waiting to be scored',
+                       lambda: sentiment_monitor.queue.qsize())
+metrics.register_counter('chatbot_sentiment_scored_total', 'Messages scored since start',
+                         lambda: sentiment_monitor.stats()['scored'])
+metrics.register_counter('chatbot_sentiment_dropped_total', 'Messages dropped because the queue was full',
+                         lambda: sentiment_monitor.stats()['dropped'])
+metrics.register_gauge('chatbot_sentiment_messages_per_second', 'Scoring throughput of the sentiment worker',
+                       lambda: sentiment_monitor.stats()['messages_per_second'])
+metrics.register_gauge('chatbot_topic_negative_share', 'Share of negative messages per menu topic',
+                       lambda: {t: s['negative_share'] for t, s in sentiment_monitor.topic_summary().items()},
+                       label='topic')
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -0,0 +1,224 @@
+"""
+Background sentiment scoring for chatbot messages.
+
+/chat only drops (topic, message) into a bounded queue; a worker thread
+scores messages in batches with the LAB 09 SentimentPredictor, keeps
+per-topic counts in memory and periodically writes them to a JSON file.
+"""
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_PROJECT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'LAB 09', 'sentiment-analysis')
+LABELS = ('Negative', 'Neutral', 'Positive')
+_STOP = object()
+
+
+def load_predictor(project_dir=SENTIMENT_PROJECT):
+    """Load the trained LAB 09 model and vectorizer once."""
+    sys.path.insert(0, os.path.join(project_dir, 'src'))
+    from predict import SentimentPredictor
+    return SentimentPredictor(os.path.join(project_dir, 'models', 'sentiment_model.pkl'),
+                              os.path.join(project_dir, 'models', 'vectorizer.pkl'))
+
+
+class SentimentMonitor:
+    def __init__(self, stats_path, predictor=None, batch_size=32, max_wait=0.5,
+                 flush_interval=30, max_queue=10000):
+        self.stats_path = stats_path
+        self.predictor = predictor
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.topics = {}
+        self.enabled = False
+        self.started = False
+        self.start_lock = threading.Lock()
+        self.thread = None
+
+        self.submitted = 0
+        self.dropped = 0
+        self.scored = 0
+        self.batches = 0
+        self.errors = 0
+        self.scoring_seconds = 0.0
+        self.last_flush = None
+        self.flushed_scored = 0  # value of scored at the last flush
+
+    def start(self):
+        """Start the worker thread, once; returns immediately.
+
+        The worker loads the model (if not injected) and runs a warm-up prediction
+        before it sets enabled, so the caller never waits for either. Until then,
+        and for good if loading fails, submit() rejects messages.
+        """
+        with self.start_lock:
+            if self.started:
+                return
+            self.started = True
+            self.thread = threading.Thread(target=self._run, name='sentiment-monitor', daemon=True)
+            self.thread.start()
+
+    def _prepare(self):
+        """Load and warm up the predictor and the previous counts; False if scoring is unavailable."""
+        try:
+            if self.predictor is None:
+                self.predictor = load_predictor()
+            self.predictor.predict_batch(['ok'])
+        except Exception as e:
+            logger.warning('Sentiment scoring disabled: %s', e)
+            return False
+        self._load_existing()
+        self.enabled = True
+        return True
+
+    def stop(self, timeout=5):
+        if self.thread is None:
+            return
+        self.enabled = False
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+        self.thread = None
+        self._flush_if_changed()
+
+    def submit(self, topic, text):
+        """Queue a message for scoring without blocking; returns False if it was dropped."""
+        if not self.enabled:
+            return False
+        try:
+            self.queue.put_nowait((topic, text))
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            return False
+        with self.lock:
+            self.submitted += 1
+        return True
+
+    def _next_batch(self):
+        """Block for the first message, then gather more until batch_size or max_wait."""
+        first = self.queue.get(timeout=self.flush_interval)
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self.queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        if not self._prepare():
+            return
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                batch = self._next_batch()
+            except queue.Empty:
+                batch = []
+            if batch is None:
+                return
+            if batch:
+                self._score(batch)
+            if time.monotonic() >= next_flush:
+                self._flush_if_changed()
+                next_flush = time.monotonic() + self.flush_interval
+
+    def _score(self, batch):
+        start = time.perf_counter()
+        try:
+            results = self.predictor.predict_batch([text for _, text in batch])
+        except Exception:
+            logger.exception('Sentiment scoring failed for a batch of %d messages', len(batch))
+            with self.lock:
+                self.errors += len(batch)
+            return
+        elapsed = time.perf_counter() - start
+
+        with self.lock:
+            for (topic, _), (label, confidence) in zip(batch, results):
+                entry = self.topics.setdefault(topic, {'messages': 0, 'confidence_sum': 0.0,
+                                                       **{l: 0 for l in LABELS}})
+                entry['messages'] += 1
+                entry[label] = entry.get(label, 0) + 1
+                entry['confidence_sum'] += confidence
+            self.scored += len(batch)
+            self.batches += 1
+            self.scoring_seconds += elapsed
+
+    def topic_summary(self):
+        with self.lock:
+            summary = {}
+            for topic, entry in self.topics.items():
+                n = entry['messages']
+                summary[topic] = {
+                    **{l: entry.get(l, 0) for l in LABELS},
+                    'messages': n,
+                    'negative_share': round(entry.get('Negative', 0) / n, 4) if n else 0.0,
+                    'mean_confidence': round(entry['confidence_sum'] / n, 4) if n else 0.0,
+                }
+            return summary
+
+    def stats(self):
+        with self.lock:
+            return {
+                'enabled': self.enabled,
+                'queue_depth': self.queue.qsize(),
+                'submitted': self.submitted,
+                'dropped': self.dropped,
+                'scored': self.scored,
+                'errors': self.errors,
+                'batches': self.batches,
+                'mean_batch_size': round(self.scored / self.batches, 2) if self.batches else 0.0,
+                'messages_per_second': round(self.scored / self.scoring_seconds, 2) if self.scoring_seconds else 0.0,
+                'last_flush': self.last_flush,
+            }
+
+    def _flush_if_changed(self):
+        """Flush only when messages were scored since the last write, so an idle worker never rewrites the file."""
+        if self.scored != self.flushed_scored:
+            self.flush()
+
+    def flush(self):
+        """Write the per-topic aggregates to stats_path (atomically)."""
+        with self.lock:
+            topics = json.loads(json.dumps(self.topics))
+            scored = self.scored
+        data = {'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'topics': topics}
+        tmp = self.stats_path + '.tmp'
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.stats_path)
+        except OSError as e:
+            logger.warning('Could not write sentiment stats: %s', e)
+            return
+        self.last_flush = data['updated_at']
+        self.flushed_scored = scored
+
+    def _load_existing(self):
+        """Continue counting from a previous run's stats file."""
+        try:
+            with open(self.stats_path) as f:
+                topics = json.load(f).get('topics', {})
+        except (OSError, ValueError):
+            topics = {}
+        with self.lock:
+            self.topics = topics
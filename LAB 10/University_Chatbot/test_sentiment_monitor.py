@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import time
+
+from sentiment_monitor import SentimentMonitor
+
+
+class FakePredictor:
+    """Labels messages containing 'bad' as Negative and records every batch it scores."""
+
+    def __init__(self, gate=None):
+        self.batches = []
+        self.gate = gate
+
+    def predict_batch(self, texts):
+        if self.gate is not None and texts != ['ok']:
+            self.gate.wait(5)
+        self.batches.append(list(texts))
+        return [('Negative', 0.9) if 'bad' in t else ('Positive', 0.8) for t in texts]
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('condition not met in time')
+        time.sleep(0.01)
+
+
+def make_monitor(tmp_path, predictor, **kwargs):
+    monitor = SentimentMonitor(str(tmp_path / 'stats.json'), predictor, **kwargs)
+    monitor.start()
+    wait_for(lambda: monitor.enabled)
+    return monitor
+
+
+def test_start_does_not_wait_for_the_model(tmp_path):
+    loaded = threading.Event()
+
+    class SlowPredictor(FakePredictor):
+        def predict_batch(self, texts):
+            loaded.wait(5)
+            return super().predict_batch(texts)
+
+    monitor = SentimentMonitor(str(tmp_path / 'stats.json'), SlowPredictor())
+    start = time.perf_counter()
+    monitor.start()
+    assert time.perf_counter() - start < 0.5
+    assert not monitor.submit('General', 'too early')
+    loaded.set()
+    wait_for(lambda: monitor.enabled)
+    monitor.stop()
+
+
+def test_failed_warm_up_keeps_scoring_disabled(tmp_path):
+    class BrokenPredictor:
+        def predict_batch(self, texts):
+            raise LookupError('stopwords not found')
+
+    monitor = SentimentMonitor(str(tmp_path / 'stats.json'), BrokenPredictor())
+    monitor.start()
+    monitor.thread.join(5)
+    assert not monitor.enabled
+    assert not monitor.submit('General', 'hello')
+    monitor.stop()
+    assert not os.path.exists(monitor.stats_path)
+
+
+def test_messages_are_scored_in_batches(tmp_path):
+    predictor = FakePredictor()
+    monitor = make_monitor(tmp_path, predictor, batch_size=4, max_wait=1)
+    monitor.submit('General', 'first')
+    for i in range(10):
+        assert monitor.submit('Student Life', 'bad day' if i % 2 else 'great day')
+    wait_for(lambda: monitor.stats()['scored'] == 11)
+    monitor.stop()
+
+    # batches[0] is the warm-up; the last batch is cut short by max_wait
+    assert [len(b) for b in predictor.batches[1:]] == [4, 4, 3]
+    assert monitor.stats()['mean_batch_size'] == round(11 / 3, 2)
+    summary = monitor.topic_summary()['Student Life']
+    assert (summary['messages'], summary['Negative'], summary['Positive']) == (10, 5, 5)
+    assert summary['negative_share'] == 0.5
+
+
+def test_full_queue_drops_messages(tmp_path):
+    gate = threading.Event()
+    monitor = make_monitor(tmp_path, FakePredictor(gate), batch_size=1, max_queue=2)
+    monitor.submit('General', 'first')
+    wait_for(lambda: monitor.queue.qsize() == 0)
+    results = [monitor.submit('General', f'message {i}') for i in range(4)]
+    gate.set()
+    wait_for(lambda: monitor.stats()['scored'] == 3)
+    monitor.stop()
+
+    assert results == [True, True, False, False]
+    stats = monitor.stats()
+    assert (stats['submitted'], stats['dropped']) == (3, 2)
+
+
+def test_flush_only_when_something_was_scored(tmp_path):
+    monitor = make_monitor(tmp_path, FakePredictor(), max_wait=0.01)
+    monitor._flush_if_changed()
+    assert not os.path.exists(monitor.stats_path)
+
+    monitor.submit('General', 'bad news')
+    wait_for(lambda: monitor.stats()['scored'] == 1)
+    monitor._flush_if_changed()
+    first_write = os.path.getmtime(monitor.stats_path)
+    os.utime(monitor.stats_path, (first_write - 100, first_write - 100))
+    monitor._flush_if_changed()
+    assert os.path.getmtime(monitor.stats_path) == first_write - 100
+    monitor.stop()
+
+
+def test_counts_continue_from_previous_stats_file(tmp_path):
+    with open(tmp_path / 'stats.json', 'w') as f:
+        json.dump({'topics': {'General': {'messages': 3, 'confidence_sum': 2.4,
+                                          'Negative': 3, 'Neutral': 0, 'Positive': 0}}}, f)
+    monitor = make_monitor(tmp_path, FakePredictor(), max_wait=0.01)
+    monitor.submit('General', 'good')
+    wait_for(lambda: monitor.stats()['scored'] == 1)
+    monitor.stop()
+
+    with open(monitor.stats_path) as f:
+        general = json.load(f)['topics']['General']
+    assert (general['messages'], general['Negative'], general['Positive']) == (4, 3, 1)
@@ -0,0 +1,245 @@
+"""
+Batched, resumable embedding pipeline for the Hadith corpus.
+
+Every text is keyed by a hash of its content. Vectors are appended batch by
+batch to an on-disk store, so an interrupted run resumes where it stopped and
+re-indexing an updated corpus only encodes rows whose text changed.
+
+Usage:
+    python hadith_embed.py --data hadith_table --store hadith_store --export hadith_embaddings.npy
+    python hadith_embed.py --encoder hashing ...   # offline stub, no model download
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from hadith_ingest import HadithTable
+
+DEFAULT_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+
+
+def content_hash(text):
+    """Stable hex digest identifying a text's content."""
+    return hashlib.blake2b(str(text).encode('utf-8'), digest_size=16).hexdigest()
+
+
+class SentenceTransformerEncoder:
+    """Wraps a sentence-transformers model (the one the notebook uses by default)."""
+
+    def __init__(self, model_name=None, model=None):
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+            model_name = model_name or DEFAULT_MODEL
+            model = SentenceTransformer(model_name)
+        elif model_name is None:
+            # The name guards EmbeddingStore against mixing vectors from different models
+            card = getattr(model, 'model_card_data', None)
+            model_name = getattr(card, 'base_model', None)
+            if not model_name:
+                raise ValueError('Pass model_name when injecting a model; it could not be read from the model')
+        self.model = model
+        self.name = model_name
+        self.dim = model.get_sentence_embedding_dimension()
+
+    def encode(self, texts):
+        return np.asarray(self.model.encode(list(texts), convert_to_numpy=True), dtype=np.float32)
+
+
+class HashingEncoder:
+    """Offline stand-in encoder: signed feature hashing of word tokens, L2-normalized."""
+
+    def __init__(self, dim=384):
+        self.dim = dim
+        self.name = f'hashing-{dim}'
+
+    def encode(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in re.findall(r'\w+', str(text).lower()):
+                h = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+                out[row, h % self.dim] += 1.0 if (h >> 63) else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return out / norms
+
+
+class EmbeddingStore:
+    """Append-only vector store on disk, addressed by content hash.
+
+    Layout of the store directory:
+        meta.json    dim, dtype and the encoder name the vectors came from
+        vectors.bin  raw row-major vectors (float32 or float16)
+        hashes.txt   one content hash per line, same order as vectors.bin
+    """
+
+    def __init__(self, path, dim=None, dtype=None, encoder_name=None):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.meta_path = os.path.join(path, 'meta.json')
+        self.vectors_path = os.path.join(path, 'vectors.bin')
+        self.hashes_path = os.path.join(path, 'hashes.txt')
+
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            if dim is not None and meta['dim'] != dim:
+                raise ValueError(f"Store {path} holds {meta['dim']}-dim vectors, encoder produces {dim}")
+            if dtype is not None and np.dtype(dtype).name != meta['dtype']:
+                raise ValueError(f"Store {path} holds {meta['dtype']} vectors, not {np.dtype(dtype).name}")
+            # Hugging Face model ids are case-insensitive ('all-MiniLm-L6-v2' is all-MiniLM-L6-v2)
+            stored = meta.get('encoder')
+            if encoder_name is not None and stored is not None and stored.lower() != encoder_name.lower():
+                raise ValueError(f"Store {path} was built with {meta['encoder']}, not {encoder_name}")
+        else:
+            if dim is None:
+                raise ValueError(f'New store {path} needs a dim')
+            meta = {'dim': int(dim), 'dtype': np.dtype(dtype or 'float32').name, 'encoder': encoder_name}
+            with open(self.meta_path, 'w') as f:
+                json.dump(meta, f)
+
+        self.dim = meta['dim']
+        self.dtype = np.dtype(meta['dtype'])
+        self.row_bytes = self.dim * self.dtype.itemsize
+        self.index = {}
+        self._recover()
+
+    def _recover(self):
+        """Load the hash index, trimming any half-written tail left by an interrupted run."""
+        hashes = []
+        if os.path.exists(self.hashes_path):
+            with open(self.hashes_path) as f:
+                hashes = [line.strip() for line in f if line.endswith('\n')]
+        n_vectors = os.path.getsize(self.vectors_path) // self.row_bytes if os.path.exists(self.vectors_path) else 0
+        n = min(len(hashes), n_vectors)
+
+        with open(self.vectors_path, 'ab') as f:
+            f.truncate(n * self.row_bytes)
+        with open(self.hashes_path, 'w') as f:
+            f.writelines(h + '\n' for h in hashes[:n])
+        self.index = {h: i for i, h in enumerate(hashes[:n])}
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, h):
+        return h in self.index
+
+    def append(self, hashes, vectors):
+        vectors = np.ascontiguousarray(vectors, dtype=self.dtype)
+        if vectors.shape != (len(hashes), self.dim):
+            raise ValueError(f'Expected vectors of shape ({len(hashes)}, {self.dim}), got {vectors.shape}')
+        # Vectors go first: on recovery a hash without its vector is dropped
+        with open(self.vectors_path, 'ab') as f:
+            f.write(vectors.tobytes())
+        with open(self.hashes_path, 'a') as f:
+            f.writelines(h + '\n' for h in hashes)
+        start = len(self.index)
+        for i, h in enumerate(hashes):
+            self.index[h] = start + i
+
+    def vectors(self):
+        """Read-only memory map over every stored vector."""
+        if len(self) == 0:
+            return np.empty((0, self.dim), dtype=self.dtype)
+        return np.memmap(self.vectors_path, dtype=self.dtype, mode='r', shape=(len(self), self.dim))
+
+    def get(self, hashes):
+        """float32 matrix with one row per hash, in the given order."""
+        missing = [h for h in hashes if h not in self.index]
+        if missing:
+            raise KeyError(f'{len(missing)} hashes are not embedded yet, e.g. {missing[0]}')
+        rows = np.fromiter((self.index[h] for h in hashes), dtype=np.int64, count=len(hashes))
+        return np.asarray(self.vectors()[rows], dtype=np.float32)
+
+    def export(self, hashes, out_path):
+        """Save the corpus-ordered matrix as .npy for HadithSearchEngine.load."""
+        np.save(out_path, self.get(hashes))
+        return out_path
+
+
+def embed_corpus(texts, encoder, store, batch_size=256, progress=None):
+    """Embed every text not already in store, in batches of batch_size.
+
+    Returns (hashes, stats) where hashes lines up with texts and stats reports
+    how many rows were skipped, encoded and the encoding throughput.
+    """
+    start = time.perf_counter()
+    hashes = [content_hash(t) for t in texts]
+
+    pending_hashes, pending_texts, seen = [], [], set()
+    for h, t in zip(hashes, texts):
+        if h in store or h in seen:
+            continue
+        seen.add(h)
+        pending_hashes.append(h)
+        pending_texts.append(t)
+    hash_seconds = time.perf_counter() - start
+
+    encode_seconds = 0.0
+    for i in range(0, len(pending_texts), batch_size):
+        t0 = time.perf_counter()
+        vectors = encoder.encode(pending_texts[i:i + batch_size])
+        encode_seconds += time.perf_counter() - t0
+        store.append(pending_hashes[i:i + batch_size], vectors)
+        if progress is not None:
+            progress(min(i + batch_size, len(pending_texts)), len(pending_texts))
+
+    total_seconds = time.perf_counter() - start
+    encoded = len(pending_texts)
+    stats = {
+        'rows': len(texts),
+        'unique_rows': len(set(hashes)),
+        'already_embedded': len(texts) - sum(1 for h in hashes if h in seen),
+        'encoded': encoded,
+        'batch_size': batch_size,
+        'hash_seconds': round(hash_seconds, 4),
+        'encode_seconds': round(encode_seconds, 4),
+        'total_seconds': round(total_seconds, 4),
+        'rows_per_second': round(encoded / encode_seconds, 2) if encode_seconds > 0 else None,
+        'store_rows': len(store),
+    }
+    return hashes, stats
+
+
+def make_encoder(kind, model_name=DEFAULT_MODEL, dim=384):
+    if kind == 'sbert':
+        return SentenceTransformerEncoder(model_name)
+    if kind == 'hashing':
+        return HashingEncoder(dim)
+    raise ValueError(f"Unknown encoder '{kind}', expected 'sbert' or 'hashing'")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Incrementally embed the Hadith corpus')
+    parser.add_argument('--data', default='hadith_table', help='hadith_ingest table directory or a CSV file')
+    parser.add_argument('--column', default='Cleaned_Hadith')
+    parser.add_argument('--store', default='hadith_store')
+    parser.add_argument('--encoder', choices=['sbert', 'hashing'], default='sbert')
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--dtype', choices=['float32', 'float16'], default=None,
+                        help='Storage dtype for a new store (float32 if omitted); must match an existing store')
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--export', default=None, help='Also write the corpus-ordered matrix to this .npy')
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.data):
+        texts = HadithTable(args.data).column(args.column)
+    else:
+        texts = pd.read_csv(args.data, usecols=[args.column])[args.column].astype(str).tolist()
+    encoder = make_encoder(args.encoder, args.model)
+    store = EmbeddingStore(args.store, encoder.dim, args.dtype, encoder.name)
+    hashes, stats = embed_corpus(texts, encoder, store, args.batch_size)
+    if args.export:
+        store.export(hashes, args.export)
+        stats['exported'] = args.export
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+"""
+Hybrid lexical + embedding retrieval for HadithBot.
+
+A BM25 inverted index over the English and Arabic hadith text catches exact
+narrator names and transliterated terms that embeddings blur. Its scores are
+fused with cosine similarity from HadithSearchEngine using a configurable
+weight, and the lexical top candidates can pre-filter the vector search so
+only a few thousand rows are scored per query. Query embeddings and final
+results are kept in small LRU caches for repeated questions.
+
+Usage:
+    python hadith_hybrid.py --embeddings hadith_embaddings.npy --data hadith_table --query "Abu Huraira fasting"
+"""
+import argparse
+import json
+import re
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from hadith_search import HadithSearchEngine, normalize_rows, top_k
+
+TEXT_COLUMNS = ('English_Hadith', 'Arabic_Hadith')
+
+ARABIC_DIACRITICS = re.compile(r'[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+ARABIC_LETTER_MAP = str.maketrans({'آ': 'ا', 'أ': 'ا', 'إ': 'ا', 'ى': 'ي'})
+
+
+def tokenize(text):
+    """Lowercase word tokens, with Arabic diacritics/tatweel removed and alef forms unified."""
+    text = ARABIC_DIACRITICS.sub('', str(text).lower()).translate(ARABIC_LETTER_MAP)
+    return re.findall(r'\w+', text)
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if key in self.data:
+            self.data.move_to_end(key)
+            self.hits += 1
+            return self.data[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self.data[key] = value
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def info(self):
+        return {'size': len(self.data), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+class BM25Index:
+    """Compact BM25 inverted index with postings stored as CSR arrays.
+
+    term_offsets[t]:term_offsets[t + 1] slices doc_ids/term_freqs for term id t.
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocab = {}
+        self.term_offsets = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.zeros(0, dtype=np.int32)
+        self.term_freqs = np.zeros(0, dtype=np.uint16)
+        self.doc_lengths = np.zeros(0, dtype=np.int32)
+        self.idf = np.zeros(0, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def build(self, docs):
+        """Index an iterable of document strings; document i gets id i."""
+        term_ids, doc_ids, freqs, lengths = [], [], [], []
+        for doc_id, text in enumerate(docs):
+            counts = {}
+            tokens = tokenize(text)
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                term_ids.append(self.vocab.setdefault(token, len(self.vocab)))
+                doc_ids.append(doc_id)
+                freqs.append(min(tf, 65535))
+            lengths.append(len(tokens))
+
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        order = np.argsort(term_ids, kind='stable')
+        self.doc_ids = np.asarray(doc_ids, dtype=np.int32)[order]
+        self.term_freqs = np.asarray(freqs, dtype=np.uint16)[order]
+        df = np.bincount(term_ids, minlength=len(self.vocab))
+        self.term_offsets = np.concatenate([[0], np.cumsum(df)]).astype(np.int64)
+        self.doc_lengths = np.asarray(lengths, dtype=np.int32)
+        n = len(self.doc_lengths)
+        self.idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        return self
+
+    @classmethod
+    def from_table(cls, table, columns=TEXT_COLUMNS, **kwargs):
+        """Index the given text columns of a hadith_ingest table, one document per row."""
+        cols = [table.column(c) for c in columns]
+        return cls(**kwargs).build(' '.join(col[i] for col in cols) for i in range(len(table)))
+
+    def scores(self, query):
+        """Dense BM25 score for every document (zeros where no query term occurs)."""
+        out = np.zeros(len(self), dtype=np.float32)
+        avg_len = float(self.doc_lengths.mean()) if len(self) else 0.0
+        for token in set(tokenize(query)):
+            t = self.vocab.get(token)
+            if t is None:
+                continue
+            start, end = self.term_offsets[t], self.term_offsets[t + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.term_freqs[start:end].astype(np.float32)
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[docs] / avg_len)
+            out[docs] += self.idf[t] * tf * (self.k1 + 1) / (tf + norm)
+        return out
+
+    def top(self, query, k, scores=None):
+        """(doc_ids, scores) of the k best BM25 matches with a non-zero score.
+
+        scores may be passed in when the caller already has self.scores(query).
+        """
+        if scores is None:
+            scores = self.scores(query)
+        ids, best = top_k(scores[None, :], k)
+        keep = best[0] > 0
+        return ids[0][keep], best[0][keep]
+
+    @staticmethod
+    def _npz_path(path):
+        """np.savez appends .npz to bare names; load the file it actually wrote."""
+        return path if path.endswith('.npz') else path + '.npz'
+
+    def save(self, path):
+        np.savez(self._npz_path(path), vocab=np.array(list(self.vocab)), term_offsets=self.term_offsets,
+                 doc_ids=self.doc_ids, term_freqs=self.term_freqs, doc_lengths=self.doc_lengths,
+                 idf=self.idf, params=np.array([self.k1, self.b]))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(cls._npz_path(path))
+        index = cls(*(float(p) for p in data['params']))
+        index.vocab = {str(term): i for i, term in enumerate(data['vocab'])}
+        for name in ('term_offsets', 'doc_ids', 'term_freqs', 'doc_lengths', 'idf'):
+            setattr(index, name, data[name])
+        return index
+
+
+def min_max(x):
+    if len(x) == 0:
+        return x
+    lo, hi = float(x.min()), float(x.max())
+    if hi - lo < 1e-9:
+        return np.ones_like(x) if hi > 0 else np.zeros_like(x)
+    return (x - lo) / (hi - lo)
+
+
+class HybridRetriever:
+    """Fuses BM25 and cosine scores: alpha * vector + (1 - alpha) * lexical, both min-max scaled.
+
+    With prefilter=True, queries with at least candidate_k lexical matches only
+    score the candidate_k best BM25 rows against the embeddings. Queries with
+    fewer lexical matches add the best vector-search hits to the candidates, so
+    rare terms never crowd out the semantic matches.
+    """
+
+    def __init__(self, engine, bm25, encoder, alpha=0.5, candidate_k=2000, prefilter=True, cache_size=1024):
+        if len(bm25) != len(engine):
+            raise ValueError(f'BM25 index has {len(bm25)} documents but the engine has {len(engine)}')
+        self.engine = engine
+        self.bm25 = bm25
+        self.encoder = encoder
+        self.alpha = alpha
+        self.candidate_k = candidate_k
+        self.prefilter = prefilter
+        self.embedding_cache = LRUCache(cache_size)
+        self.result_cache = LRUCache(cache_size)
+
+    def embed(self, query):
+        key = ' '.join(tokenize(query))
+        vector = self.embedding_cache.get(key)
+        if vector is None:
+            vector = normalize_rows(self.encoder.encode([query]))[0]
+            self.embedding_cache.put(key, vector)
+        return vector
+
+    def search_ids(self, query, k=10, alpha=None):
+        """Return (ids, fused, cosine, bm25) arrays for the top k rows."""
+        alpha = self.alpha if alpha is None else alpha
+        q = self.embed(query)
+        n_cand = max(k, self.candidate_k)
+        bm25_scores = self.bm25.scores(query)
+        lex_ids, _ = self.bm25.top(query, n_cand, bm25_scores)
+
+        if self.prefilter and len(lex_ids) >= n_cand:
+            cand = np.sort(lex_ids)
+        else:
+            vec_ids, _ = self.engine.search_ids(q, n_cand)
+            cand = np.union1d(vec_ids[0], lex_ids)
+
+        cosine = np.asarray(self.engine.vectors[cand], dtype=np.float32) @ q
+        lexical = bm25_scores[cand]
+        fused = alpha * min_max(cosine) + (1 - alpha) * min_max(lexical)
+        order, _ = top_k(fused[None, :], k)
+        order = order[0]
+        return cand[order], fused[order], cosine[order], lexical[order]
+
+    def search(self, query, k=10, alpha=None):
+        """Hits for one query string, best first, with fused/cosine/bm25 scores attached.
+
+        Cached results are copied on the way out, so callers may modify the hits.
+        """
+        alpha = self.alpha if alpha is None else alpha
+        key = (' '.join(tokenize(query)), k, alpha)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            return [dict(hit) for hit in cached]
+
+        ids, fused, cosine, lexical = self.search_ids(query, k, alpha)
+        hits = self.engine.rows(ids, fused)
+        for hit, c, l in zip(hits, cosine, lexical):
+            hit['cosine'] = float(c)
+            hit['bm25'] = float(l)
+        self.result_cache.put(key, [dict(hit) for hit in hits])
+        return hits
+
+    def cache_info(self):
+        return {'embeddings': self.embedding_cache.info(), 'results': self.result_cache.info()}
+
+
+def main(argv=None):
+    from hadith_embed import make_encoder
+    from hadith_ingest import HadithTable
+
+    parser = argparse.ArgumentParser(description='Hybrid BM25 + embedding search over the Hadith corpus')
+    parser.add_argument('--embeddings', default='hadith_embaddings.npy')
+    parser.add_argument('--data', default='hadith_table', help='hadith_ingest table directory')
+    parser.add_argument('--encoder', choices=['sbert', 'hashing'], default='sbert')
+    parser.add_argument('--query', required=True)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--alpha', type=float, default=0.5)
+    parser.add_argument('--candidates', type=int, default=2000)
+    parser.add_argument('--no-prefilter', action='store_true')
+    args = parser.parse_args(argv)
+
+    table = HadithTable(args.data)
+    engine = HadithSearchEngine.load(args.embeddings, args.data)
+    start = time.perf_counter()
+    bm25 = BM25Index.from_table(table)
+    build_s = time.perf_counter() - start
+
+    retriever = HybridRetriever(engine, bm25, make_encoder(args.encoder), args.alpha,
+                                args.candidates, not args.no_prefilter)
+    start = time.perf_counter()
+    hits = retriever.search(args.query, args.k)
+    query_ms = (time.perf_counter() - start) * 1000
+    print(json.dumps({'bm25_build_seconds': round(build_s, 3), 'query_ms': round(query_ms, 3),
+                      'hits': hits}, indent=2, ensure_ascii=False, default=str))
+
+
+if __name__ == '__main__':
+    main()
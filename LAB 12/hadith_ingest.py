@@ -0,0 +1,293 @@
+"""
+Parallel, streaming ingestion of the LK-Hadith-Corpus CSVs into a columnar table.
+
+Chapter CSVs are parsed and cleaned in worker processes, chunk by chunk, and
+appended in sorted file order to an on-disk table, so row ids are stable and
+the corpus is never held in memory as one big Python list. Every column can
+be memory-mapped by the search and embedding stages.
+
+Table layout (one directory):
+    meta.json         column kinds, row count, corpus root and the files already ingested
+    <col>.i64         int64 values for numeric columns (-1 when missing)
+    <col>.off         int64 end offsets for text columns
+    <col>.txt         concatenated UTF-8 text for text columns
+
+Usage:
+    python hadith_ingest.py --corpus LK-Hadith-Corpus --out hadith_table
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = [
+    'Chapter_Number', 'Chapter_English', 'Chpater_Arabic',
+    'Section_Number', 'Section_English', 'Section_Arabic',
+    'Hadith_Number',
+    'English_Hadith', 'English_Isnad', 'English_Matn', 'English_Grade',
+    'Arabic_Hadith', 'Arabic_Isnab', 'Arabic_Matn', 'Arabic_Grade'
+]
+NUMERIC_COLUMNS = ['row_id', 'file_id', 'Chapter_Number', 'Section_Number', 'Hadith_Number']
+TABLE_COLUMNS = ['row_id', 'file_id'] + COLUMNS + ['Cleaned_Hadith']
+
+
+def clean_text(text):
+    """Lowercase, drop punctuation and collapse runs of whitespace to one space."""
+    text = str(text).lower()
+    text = re.sub(r'[^a-z0-9\s]', '', text)  # Remove punctuation
+    text = re.sub(r'\s+', ' ', text)          # Collapse extra space
+    return text.strip()
+
+
+def clean_series(s):
+    """Vectorized clean_text over a pandas Series."""
+    return (s.astype(str).str.lower()
+            .str.replace(r'[^a-z0-9\s]', '', regex=True)
+            .str.replace(r'\s+', ' ', regex=True)
+            .str.strip())
+
+
+def parse_file(path, chunksize=2000):
+    """Read one chapter CSV in chunks and return its cleaned columns as numpy arrays.
+
+    Returns (columns, coerced) where coerced counts, per numeric column, the
+    values that did not parse as numbers and were stored as -1.
+    """
+    parts = []
+    for chunk in pd.read_csv(path, names=COLUMNS, skiprows=1, chunksize=chunksize, dtype=str, keep_default_na=False):
+        chunk['Cleaned_Hadith'] = clean_series(chunk['English_Hadith'])
+        parts.append(chunk)
+    if not parts:
+        return {}, {}
+    df = pd.concat(parts, ignore_index=True)
+    out, coerced = {}, {}
+    for col in COLUMNS + ['Cleaned_Hadith']:
+        if col in NUMERIC_COLUMNS:
+            values = pd.to_numeric(df[col], errors='coerce')
+            coerced[col] = int(values.isna().sum())
+            out[col] = values.fillna(-1).astype(np.int64).to_numpy()
+        else:
+            out[col] = df[col].to_numpy(dtype=object)
+    return out, coerced
+
+
+class TextColumn:
+    """Memory-mapped variable-length text column; rows are decoded on access."""
+
+    def __init__(self, data_path, offsets_path):
+        self.offsets = np.zeros(0, np.int64)
+        self.data = np.zeros(0, np.uint8)
+        if os.path.exists(offsets_path) and os.path.getsize(offsets_path):
+            self.offsets = np.memmap(offsets_path, dtype=np.int64, mode='r')
+        if os.path.exists(data_path) and os.path.getsize(data_path):
+            self.data = np.memmap(data_path, dtype=np.uint8, mode='r')
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if not isinstance(i, (int, np.integer)):
+            return [self[int(j)] for j in i]
+        if i < 0:
+            i += len(self)
+        start = int(self.offsets[i - 1]) if i > 0 else 0
+        return bytes(self.data[start:int(self.offsets[i])]).decode('utf-8')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class HadithTable:
+    """Reader/appender for the columnar table written by ingest()."""
+
+    def __init__(self, path):
+        self.path = path
+        self.meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {'columns': {c: ('int' if c in NUMERIC_COLUMNS else 'text') for c in TABLE_COLUMNS},
+                         'rows': 0, 'files': []}
+        self._columns = {}  # memory maps are reused until the table changes
+
+    def __len__(self):
+        return self.meta['rows']
+
+    @property
+    def columns(self):
+        return list(self.meta['columns'])
+
+    def _paths(self, col):
+        base = os.path.join(self.path, col)
+        if self.meta['columns'][col] == 'int':
+            return base + '.i64',
+        return base + '.txt', base + '.off'
+
+    def column(self, col):
+        """Memory-mapped int64 array for numeric columns, TextColumn for text columns."""
+        if col not in self.meta['columns']:
+            raise KeyError(f"Unknown column '{col}'")
+        cached = self._columns.get(col)
+        if cached is not None:
+            return cached
+        paths = self._paths(col)
+        if self.meta['columns'][col] == 'int':
+            if len(self) == 0:
+                column = np.zeros(0, np.int64)
+            else:
+                column = np.memmap(paths[0], dtype=np.int64, mode='r', shape=(len(self),))
+        else:
+            column = TextColumn(*paths)
+        self._columns[col] = column
+        return column
+
+    def row(self, i, columns=None):
+        row = {}
+        for col in columns or self.columns:
+            value = self.column(col)[int(i)]
+            row[col] = int(value) if isinstance(value, np.integer) else value
+        return row
+
+    def to_frame(self, columns=None, rows=None):
+        """Materialize (a subset of) the table as a DataFrame."""
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.int64)
+        return pd.DataFrame({col: (np.asarray(self.column(col))[rows] if self.meta['columns'][col] == 'int'
+                                   else self.column(col)[rows])
+                             for col in columns or self.columns})
+
+    def append(self, rel_path, columns):
+        """Append one parsed file, assigning row ids after the current last row."""
+        os.makedirs(self.path, exist_ok=True)
+        n = len(columns['English_Hadith']) if columns else 0
+        columns = {col: columns.get(col, []) for col in COLUMNS + ['Cleaned_Hadith']}
+        columns['row_id'] = np.arange(len(self), len(self) + n, dtype=np.int64)
+        columns['file_id'] = np.full(n, len(self.meta['files']), dtype=np.int64)
+
+        for col, kind in self.meta['columns'].items():
+            paths = self._paths(col)
+            if kind == 'int':
+                with open(paths[0], 'ab') as f:
+                    f.write(np.ascontiguousarray(columns[col], dtype=np.int64).tobytes())
+                continue
+            encoded = [str(v).encode('utf-8') for v in columns[col]]
+            base = 0
+            if os.path.exists(paths[0]):
+                base = os.path.getsize(paths[0])
+            ends = base + np.cumsum([len(b) for b in encoded], dtype=np.int64)
+            with open(paths[0], 'ab') as f:
+                f.write(b''.join(encoded))
+            with open(paths[1], 'ab') as f:
+                f.write(ends.tobytes())
+
+        self.meta['rows'] += n
+        self.meta['files'].append(rel_path)
+        self._columns.clear()
+        # meta.json is written last, so it only ever counts fully appended files
+        tmp = self.meta_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self.meta_path)
+
+    def truncate_to_meta(self):
+        """Drop bytes past the row count in meta.json (left behind by an interrupted append)."""
+        self._columns.clear()
+        if not os.path.isdir(self.path):
+            return
+        for col, kind in self.meta['columns'].items():
+            paths = self._paths(col)
+            if kind == 'int':
+                if os.path.exists(paths[0]):
+                    with open(paths[0], 'r+b') as f:
+                        f.truncate(len(self) * 8)
+                continue
+            if not os.path.exists(paths[1]):
+                continue
+            with open(paths[1], 'r+b') as f:
+                f.truncate(len(self) * 8)
+            end = 0
+            if len(self):
+                end = int(np.memmap(paths[1], dtype=np.int64, mode='r')[len(self) - 1])
+            with open(paths[0], 'r+b') as f:
+                f.truncate(end)
+
+
+def find_files(corpus_dir):
+    return sorted(glob.glob(os.path.join(corpus_dir, '**', '*.csv'), recursive=True))
+
+
+def ingest(files, out_dir, root=None, workers=None, chunksize=2000):
+    """Parse files in parallel and append the ones not yet in out_dir, in sorted order.
+
+    Files already listed in the table are skipped, so adding a collection keeps
+    every existing row id unchanged. Files are recorded relative to root; when it
+    is not given, the root stored by the first ingest into out_dir is reused (or,
+    for a new table, the common directory of files). Returns (table, stats).
+    """
+    start = time.perf_counter()
+    table = HadithTable(out_dir)
+    table.truncate_to_meta()
+    if root is None:
+        root = table.meta.get('root')
+    if root is None:
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files]) if files else ''
+    table.meta['root'] = os.path.abspath(root)  # saved with the next append
+    done = set(table.meta['files'])
+    todo = [f for f in sorted(files) if os.path.relpath(f, root) not in done]
+    rows_before = len(table)
+    coerced = {}
+
+    def append(path, future):
+        columns, file_coerced = future.result()
+        table.append(os.path.relpath(path, root), columns)
+        for col, n in file_coerced.items():
+            coerced[col] = coerced.get(col, 0) + n
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep a bounded window of files in flight and append strictly in order
+        pending = []
+        for path in todo:
+            pending.append((path, pool.submit(parse_file, path, chunksize)))
+            if len(pending) >= workers * 2:
+                append(*pending.pop(0))
+        for path0, future in pending:
+            append(path0, future)
+
+    seconds = time.perf_counter() - start
+    stats = {
+        'files_ingested': len(todo),
+        'files_skipped': len(files) - len(todo),
+        'rows_added': len(table) - rows_before,
+        'numeric_values_coerced': coerced,
+        'rows_total': len(table),
+        'seconds': round(seconds, 3),
+        'rows_per_second': round((len(table) - rows_before) / seconds, 1) if seconds > 0 else None,
+    }
+    return table, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ingest LK-Hadith-Corpus CSVs into a columnar table')
+    parser.add_argument('--corpus', default='LK-Hadith-Corpus')
+    parser.add_argument('--out', default='hadith_table')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunksize', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    files = find_files(args.corpus)
+    _, stats = ingest(files, args.out, root=args.corpus, workers=args.workers, chunksize=args.chunksize)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == '__main__':
+    main()
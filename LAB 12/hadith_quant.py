@@ -0,0 +1,284 @@
+"""
+Compressed storage and search for the Hadith embeddings.
+
+Two quantizers shrink the float32 vectors kept in memory:
+    int8  per-dimension scalar quantization, 1 byte per dimension (4x smaller)
+    pq    product quantization, m bytes per vector with trained codebooks
+
+Search scores the compressed codes, then re-ranks the best candidates with
+full-precision rows read lazily from the original .npy through a memory map.
+
+Usage:
+    python hadith_quant.py --embeddings hadith_embaddings.npy --out hadith_pq --kind pq --m 48
+    python hadith_quant.py --embeddings hadith_embaddings.npy --benchmark
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from hadith_search import HadithSearchEngine, kmeans, assign_clusters, lookup_rows, normalize_rows, sample_queries, top_k
+
+
+class ScalarQuantizer:
+    """uint8 codes per dimension: x ~= lo + code * scale."""
+
+    kind = 'int8'
+
+    def __init__(self):
+        self.lo = None
+        self.scale = None
+
+    def train(self, x):
+        self.lo = x.min(axis=0).astype(np.float32)
+        hi = x.max(axis=0).astype(np.float32)
+        self.scale = np.maximum(hi - self.lo, 1e-12) / 255
+        return self
+
+    def encode(self, x):
+        return np.clip(np.rint((x - self.lo) / self.scale), 0, 255).astype(np.uint8)
+
+    def decode(self, codes):
+        return self.lo + codes.astype(np.float32) * self.scale
+
+    def scores(self, codes, queries, chunk_size=4096):
+        """Approximate inner products for a batch of queries against codes.
+
+        Codes are widened to float32 chunk_size rows at a time, so the float copy
+        stays a few MB instead of 4x the size of the whole block.
+        """
+        weighted = queries * self.scale
+        out = np.empty((len(queries), len(codes)), dtype=np.float32)
+        for start in range(0, len(codes), chunk_size):
+            out[:, start:start + chunk_size] = weighted @ codes[start:start + chunk_size].T.astype(np.float32)
+        out += (queries @ self.lo)[:, None]
+        return out
+
+    def nbytes(self):
+        return self.lo.nbytes + self.scale.nbytes
+
+    def state(self):
+        return {'lo': self.lo, 'scale': self.scale}
+
+    def load_state(self, state):
+        self.lo, self.scale = state['lo'], state['scale']
+        return self
+
+
+class ProductQuantizer:
+    """Splits vectors into m sub-vectors and stores the nearest of ksub centroids for each."""
+
+    kind = 'pq'
+
+    def __init__(self, m=48, ksub=256, n_iter=20, seed=0):
+        if ksub > 256:
+            raise ValueError('ksub must fit in one byte (<= 256)')
+        self.m = m
+        self.ksub = ksub
+        self.n_iter = n_iter
+        self.seed = seed
+        self.codebooks = None
+
+    def _split(self, x):
+        d = x.shape[1]
+        if d % self.m:
+            raise ValueError(f'Dimension {d} is not divisible by m={self.m}')
+        return x.reshape(len(x), self.m, d // self.m)
+
+    def train(self, x):
+        sub = self._split(x)
+        self.codebooks = np.stack([
+            kmeans(sub[:, j], self.ksub, self.n_iter, self.seed + j, sample_size=self.ksub * 64)[0]
+            for j in range(self.m)
+        ]).astype(np.float32)
+        return self
+
+    def encode(self, x):
+        sub = self._split(np.asarray(x, dtype=np.float32))
+        codes = np.empty((len(x), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            codes[:, j] = assign_clusters(sub[:, j], self.codebooks[j])
+        return codes
+
+    def decode(self, codes):
+        return np.concatenate([self.codebooks[j][codes[:, j]] for j in range(self.m)], axis=1)
+
+    def scores(self, codes, queries):
+        """Asymmetric distance computation: per-query lookup tables summed over sub-spaces."""
+        tables = np.einsum('qmd,mkd->qmk', self._split(queries), self.codebooks)
+        out = np.zeros((len(queries), len(codes)), dtype=np.float32)
+        for j in range(self.m):
+            out += tables[:, j, codes[:, j]]
+        return out
+
+    def nbytes(self):
+        return self.codebooks.nbytes
+
+    def state(self):
+        return {'codebooks': self.codebooks, 'params': np.array([self.m, self.ksub, self.n_iter, self.seed])}
+
+    def load_state(self, state):
+        self.m, self.ksub, self.n_iter, self.seed = (int(v) for v in state['params'])
+        self.codebooks = state['codebooks']
+        return self
+
+
+QUANTIZERS = {'int8': ScalarQuantizer, 'pq': ProductQuantizer}
+
+
+class QuantizedIndex:
+    """Search over quantized codes with lazy full-precision re-ranking."""
+
+    def __init__(self, quantizer, codes, raw_path, metadata=None, rerank=100, block_size=65536):
+        self.quantizer = quantizer
+        self.codes = codes
+        self.raw_path = raw_path
+        self.metadata = metadata
+        self.rerank = rerank
+        self.block_size = block_size
+        self._raw = None
+
+    def __len__(self):
+        return len(self.codes)
+
+    @classmethod
+    def build(cls, embeddings_path, kind='int8', train_size=50000, seed=0, **kwargs):
+        """Train a quantizer on a sample of embeddings_path and encode every row."""
+        raw = np.load(embeddings_path, mmap_mode='r')
+        rng = np.random.default_rng(seed)
+        sample = np.sort(rng.choice(len(raw), min(train_size, len(raw)), replace=False))
+        quantizer = QUANTIZERS[kind](**kwargs).train(normalize_rows(raw[sample]))
+
+        codes = None
+        for start in range(0, len(raw), 65536):
+            block = quantizer.encode(normalize_rows(raw[start:start + 65536]))
+            if codes is None:
+                codes = np.empty((len(raw),) + block.shape[1:], dtype=np.uint8)
+            codes[start:start + len(block)] = block
+        return cls(quantizer, codes, embeddings_path)
+
+    def save(self, out_dir):
+        os.makedirs(out_dir, exist_ok=True)
+        np.save(os.path.join(out_dir, 'codes.npy'), self.codes)
+        np.savez(os.path.join(out_dir, 'quantizer.npz'), **self.quantizer.state())
+        with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+            json.dump({'kind': self.quantizer.kind, 'raw_path': os.path.abspath(self.raw_path),
+                       'rows': len(self)}, f)
+
+    @classmethod
+    def load(cls, out_dir, metadata=None, rerank=100):
+        with open(os.path.join(out_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        quantizer = QUANTIZERS[meta['kind']]().load_state(np.load(os.path.join(out_dir, 'quantizer.npz')))
+        codes = np.load(os.path.join(out_dir, 'codes.npy'), mmap_mode='r')
+        return cls(quantizer, codes, meta['raw_path'], metadata, rerank)
+
+    def memory_bytes(self):
+        return self.codes.nbytes + self.quantizer.nbytes()
+
+    def raw(self):
+        if self._raw is None:
+            self._raw = np.load(self.raw_path, mmap_mode='r')
+        return self._raw
+
+    def approximate(self, queries, k):
+        """(ids, scores) of the top k by compressed-domain score alone."""
+        best_ids = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, len(self.codes), self.block_size):
+            block = np.asarray(self.codes[start:start + self.block_size])
+            ids, scores = top_k(self.quantizer.scores(block, queries), k)
+            merged_ids = np.concatenate([best_ids, ids + start], axis=1)
+            keep, best_scores = top_k(np.concatenate([best_scores, scores], axis=1), k)
+            best_ids = np.take_along_axis(merged_ids, keep, axis=1)
+        return best_ids, best_scores
+
+    def search_ids(self, queries, k=10, rerank=None):
+        """Top k (ids, cosine scores); rerank=0 skips the full-precision pass."""
+        queries = normalize_rows(np.atleast_2d(queries))
+        rerank = self.rerank if rerank is None else rerank
+        cand, approx = self.approximate(queries, max(k, rerank))
+        if rerank == 0:
+            return cand[:, :k], approx[:, :k]
+
+        raw = self.raw()
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for i, q in enumerate(queries):
+            rows = np.sort(cand[i])
+            exact = normalize_rows(raw[rows]) @ q
+            local, best = top_k(exact[None, :], k)
+            ids[i, :local.shape[1]] = rows[local[0]]
+            scores[i, :local.shape[1]] = best[0]
+        return ids, scores
+
+    def search(self, queries, k=10, rerank=None):
+        ids, scores = self.search_ids(queries, k, rerank)
+        return [lookup_rows(self.metadata, i, s) for i, s in zip(ids, scores)]
+
+
+def _timed(search, queries, batch_size):
+    start = time.perf_counter()
+    ids = np.concatenate([search(queries[i:i + batch_size]) for i in range(0, len(queries), batch_size)])
+    return ids, (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def benchmark(embeddings_path, n_queries=200, k=10, pq_m=(16, 48), reranks=(0, 50, 200), batch_size=64):
+    """Memory footprint, latency and recall@k of int8/PQ search against exact float32 search."""
+    engine = HadithSearchEngine(np.load(embeddings_path, mmap_mode='r'))
+    queries = sample_queries(engine.vectors, n_queries)
+    truth, exact_ms = _timed(lambda q: engine.search_ids(q, k)[0], queries, batch_size)
+
+    report = {
+        'corpus_size': len(engine),
+        'dim': int(engine.vectors.shape[1]),
+        'queries': len(queries),
+        'k': k,
+        'exact_float32': {'memory_bytes': int(engine.vectors.nbytes), 'ms_per_query': round(exact_ms, 4), 'recall': 1.0},
+        'quantized': [],
+    }
+    configs = [('int8', {})] + [('pq', {'m': m}) for m in pq_m if engine.vectors.shape[1] % m == 0]
+    for kind, params in configs:
+        start = time.perf_counter()
+        index = QuantizedIndex.build(embeddings_path, kind, **params)
+        build_s = time.perf_counter() - start
+        for rerank in reranks:
+            ids, ms = _timed(lambda q: index.search_ids(q, k, rerank)[0], queries, batch_size)
+            hits = sum(len(np.intersect1d(a, b)) for a, b in zip(truth, ids))
+            report['quantized'].append({
+                'kind': kind,
+                **params,
+                'rerank': rerank,
+                'memory_bytes': int(index.memory_bytes()),
+                'compression': round(engine.vectors.nbytes / index.memory_bytes(), 2),
+                'build_seconds': round(build_s, 3),
+                'ms_per_query': round(ms, 4),
+                f'recall@{k}': round(hits / truth.size, 4),
+            })
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Quantized Hadith embedding index and benchmark')
+    parser.add_argument('--embeddings', default='hadith_embaddings.npy')
+    parser.add_argument('--out', default='hadith_quantized', help='Directory for the codes and codebooks')
+    parser.add_argument('--kind', choices=sorted(QUANTIZERS), default='int8')
+    parser.add_argument('--m', type=int, default=48, help='PQ sub-spaces (bytes per vector)')
+    parser.add_argument('--benchmark', action='store_true', help='Compare int8/PQ against exact search')
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        print(json.dumps(benchmark(args.embeddings, args.queries), indent=2))
+        return
+    params = {'m': args.m} if args.kind == 'pq' else {}
+    index = QuantizedIndex.build(args.embeddings, args.kind, **params)
+    index.save(args.out)
+    print(json.dumps({'kind': args.kind, 'rows': len(index), 'memory_bytes': int(index.memory_bytes()),
+                      'out': args.out}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+"""
+Vector search over the Hadith embeddings produced by HadithBot.ipynb.
+
+Exact mode scores every hadith with one matrix product per query batch and
+keeps the best k with argpartition. IVF mode clusters the corpus once with
+k-means and only scores the hadith in the n_probe closest clusters.
+
+Usage:
+    python hadith_search.py --embeddings hadith_embaddings.npy --data hadith_table
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from hadith_ingest import HadithTable
+
+RESULT_COLUMNS = ['Chapter_Number', 'Chapter_English', 'Hadith_Number', 'English_Hadith']
+
+
+def normalize_rows(x):
+    """Return x scaled to unit L2 norm per row (zero rows stay zero)."""
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+
+def top_k(scores, k):
+    """Indices and values of the k highest scores in each row, best first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(scores.dtype)
+    if k < scores.shape[1]:
+        idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        idx = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+    part = np.take_along_axis(scores, idx, axis=1)
+    order = np.argsort(-part, axis=1)
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(part, order, axis=1)
+
+
+def kmeans(x, n_clusters, n_iter=20, seed=0, sample_size=None, chunk_size=65536):
+    """Plain Lloyd k-means returning (centroids, assignments) for the rows of x."""
+    rng = np.random.default_rng(seed)
+    x = np.asarray(x, dtype=np.float32)
+    train = x
+    if sample_size is not None and sample_size < len(x):
+        train = x[np.sort(rng.choice(len(x), sample_size, replace=False))]
+    n_clusters = min(n_clusters, len(train))
+    centroids = train[rng.choice(len(train), n_clusters, replace=False)].copy()
+
+    for _ in range(n_iter):
+        assign = assign_clusters(train, centroids, chunk_size)
+        counts = np.bincount(assign, minlength=n_clusters)
+        empty = counts == 0
+        # Sum each cluster's members with one reduceat over the rows sorted by cluster
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        sums = np.add.reduceat(train[np.argsort(assign, kind='stable')], starts[~empty], axis=0)
+        centroids[~empty] = sums / counts[~empty, None]
+        # Re-seed empty clusters from random points so every list stays usable
+        if empty.any():
+            centroids[empty] = train[rng.choice(len(train), int(empty.sum()), replace=False)]
+
+    return centroids, assign_clusters(x, centroids, chunk_size)
+
+
+def assign_clusters(x, centroids, chunk_size=65536):
+    """Index of the nearest centroid (squared L2) for every row of x."""
+    c_sq = (centroids ** 2).sum(axis=1)
+    out = np.empty(len(x), dtype=np.int64)
+    for start in range(0, len(x), chunk_size):
+        block = np.asarray(x[start:start + chunk_size], dtype=np.float32)
+        dist = c_sq[None, :] - 2 * block @ centroids.T
+        out[start:start + len(block)] = dist.argmin(axis=1)
+    return out
+
+
+class IVFIndex:
+    """Inverted-file index: corpus rows grouped by their nearest k-means centroid."""
+
+    def __init__(self, n_lists=None, n_probe=8, n_iter=20, seed=0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.seed = seed
+        self.centroids = None
+        self.list_ids = None
+        self.list_offsets = None
+
+    def train(self, vectors):
+        n = len(vectors)
+        n_lists = self.n_lists or max(1, int(4 * np.sqrt(n)))
+        sample = min(n, max(n_lists * 64, 10000))
+        centroids, assign = kmeans(vectors, n_lists, self.n_iter, self.seed, sample_size=sample)
+        self.centroids = normalize_rows(centroids)
+        self.list_ids = np.argsort(assign, kind='stable')
+        counts = np.bincount(assign, minlength=len(self.centroids))
+        self.list_offsets = np.concatenate([[0], np.cumsum(counts)])
+        return self
+
+    def candidates(self, query, n_probe=None):
+        """Corpus ids stored in the n_probe lists closest to a single normalized query."""
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+        return np.concatenate([self.list_ids[self.list_offsets[l]:self.list_offsets[l + 1]] for l in lists])
+
+    def search(self, vectors, queries, k, n_probe=None):
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for i, q in enumerate(queries):
+            cand = np.sort(self.candidates(q, n_probe))
+            if len(cand) == 0:
+                continue
+            s = np.asarray(vectors[cand]) @ q
+            local, best = top_k(s[None, :], k)
+            ids[i, :local.shape[1]] = cand[local[0]]
+            scores[i, :local.shape[1]] = best[0]
+        return ids, scores
+
+
+class HadithSearchEngine:
+    """Top-k cosine search over hadith embeddings, returning the matching corpus rows.
+
+    Embeddings are L2-normalized on construction; pass normalized=True only for
+    a matrix that is already unit-norm (load() does this for its cached memory map).
+    """
+
+    def __init__(self, embeddings, metadata=None, block_size=262144, normalized=False):
+        self.vectors = embeddings if normalized else normalize_rows(embeddings)
+        self.metadata = metadata
+        self.block_size = block_size
+        self.ivf = None
+
+    @classmethod
+    def load(cls, embeddings_path, data_path=None, cache_normalized=True):
+        """Memory-map embeddings_path, normalizing it once into a cached .norm.npy file.
+
+        data_path is either a hadith_ingest table directory or cleaned_hadith_data.csv.
+        """
+        vectors = load_normalized(embeddings_path, cache_normalized)
+        metadata = None
+        if data_path is not None:
+            if os.path.isdir(data_path):
+                metadata = HadithTable(data_path)
+            else:
+                metadata = pd.read_csv(data_path, usecols=RESULT_COLUMNS)
+            if len(metadata) != len(vectors):
+                raise ValueError(f'{data_path} has {len(metadata)} rows but {embeddings_path} has {len(vectors)}')
+        return cls(vectors, metadata, normalized=True)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def build_ivf(self, n_lists=None, n_probe=8, n_iter=20, seed=0):
+        self.ivf = IVFIndex(n_lists, n_probe, n_iter, seed).train(self.vectors)
+        return self.ivf
+
+    def search_ids(self, queries, k=10, mode='exact', n_probe=None):
+        """Return (ids, scores) arrays of shape (n_queries, k) for a batch of query vectors."""
+        queries = normalize_rows(np.atleast_2d(queries))
+        if mode == 'exact':
+            return self._exact(queries, k)
+        if mode == 'ivf':
+            if self.ivf is None:
+                self.build_ivf()
+            return self.ivf.search(self.vectors, queries, min(k, len(self)), n_probe)
+        raise ValueError(f"Unknown search mode '{mode}', expected 'exact' or 'ivf'")
+
+    def _exact(self, queries, k):
+        n = len(self.vectors)
+        if n <= self.block_size:
+            return top_k(queries @ np.asarray(self.vectors).T, k)
+
+        # Score the corpus block by block and keep a running top-k so a large
+        # memory-mapped matrix never has to be resident all at once
+        best_ids = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, n, self.block_size):
+            block = np.asarray(self.vectors[start:start + self.block_size])
+            ids, scores = top_k(queries @ block.T, k)
+            merged_ids = np.concatenate([best_ids, ids + start], axis=1)
+            merged_scores = np.concatenate([best_scores, scores], axis=1)
+            keep, best_scores = top_k(merged_scores, k)
+            best_ids = np.take_along_axis(merged_ids, keep, axis=1)
+        return best_ids, best_scores
+
+    def rows(self, ids, scores):
+        """Hadith rows (as dicts) for one query's ids/scores, skipping padding ids."""
+        return lookup_rows(self.metadata, ids, scores)
+
+    def search(self, queries, k=10, mode='exact', n_probe=None):
+        """Batched search returning a list of hit lists, one per query vector."""
+        ids, scores = self.search_ids(queries, k, mode, n_probe)
+        return [self.rows(i, s) for i, s in zip(ids, scores)]
+
+    def search_text(self, texts, encoder, k=10, mode='exact', n_probe=None):
+        """Encode texts with encoder (anything with .encode(list)) and search."""
+        if isinstance(texts, str):
+            texts = [texts]
+        return self.search(encoder.encode(list(texts)), k, mode, n_probe)
+
+
+def lookup_rows(metadata, ids, scores):
+    """Build hit dicts for ids/scores, adding RESULT_COLUMNS from a HadithTable or DataFrame."""
+    hits = []
+    for i, s in zip(ids, scores):
+        if i < 0:
+            continue
+        row = {'id': int(i), 'score': float(s)}
+        if isinstance(metadata, HadithTable):
+            row.update(metadata.row(i, RESULT_COLUMNS))
+        elif metadata is not None:
+            for col, value in metadata.iloc[int(i)].items():
+                row[col] = value.item() if hasattr(value, 'item') else value
+        hits.append(row)
+    return hits
+
+
+def load_normalized(embeddings_path, cache_normalized=True, chunk_size=65536):
+    """Memory-map the unit-normalized copy of embeddings_path, creating it on first use."""
+    raw = np.load(embeddings_path, mmap_mode='r')
+    if not cache_normalized:
+        return normalize_rows(raw)
+
+    root, _ = os.path.splitext(embeddings_path)
+    norm_path = root + '.norm.npy'
+    if os.path.exists(norm_path) and os.path.getmtime(norm_path) >= os.path.getmtime(embeddings_path):
+        cached = np.load(norm_path, mmap_mode='r')
+        if cached.shape == raw.shape:
+            return cached
+
+    out = np.lib.format.open_memmap(norm_path, mode='w+', dtype=np.float32, shape=raw.shape)
+    for start in range(0, len(raw), chunk_size):
+        out[start:start + chunk_size] = normalize_rows(raw[start:start + chunk_size])
+    out.flush()
+    del out
+    return np.load(norm_path, mmap_mode='r')
+
+
+def sample_queries(vectors, n_queries=200, noise=0.05, seed=0):
+    """Perturbed corpus rows used as stand-in queries when no query set is available."""
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(vectors), min(n_queries, len(vectors)), replace=False)
+    base = np.asarray(vectors[np.sort(picks)], dtype=np.float32)
+    return normalize_rows(base + rng.normal(0, noise, base.shape).astype(np.float32))
+
+
+def recall_latency_report(engine, queries, k=10, n_probes=(1, 2, 4, 8, 16, 32), batch_size=64):
+    """Recall@k of IVF search against exact search, with per-query latency, for each n_probe."""
+    queries = normalize_rows(queries)
+
+    start = time.perf_counter()
+    truth = np.concatenate([engine.search_ids(queries[i:i + batch_size], k)[0]
+                            for i in range(0, len(queries), batch_size)])
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    if engine.ivf is None:
+        engine.build_ivf()
+
+    report = {
+        'corpus_size': len(engine),
+        'queries': len(queries),
+        'k': k,
+        'n_lists': len(engine.ivf.centroids),
+        'exact': {'recall': 1.0, 'ms_per_query': round(exact_ms, 4)},
+        'ivf': [],
+    }
+    for n_probe in n_probes:
+        if n_probe > len(engine.ivf.centroids):
+            break
+        start = time.perf_counter()
+        ids, _ = engine.search_ids(queries, k, mode='ivf', n_probe=n_probe)
+        ms = (time.perf_counter() - start) * 1000 / len(queries)
+        hits = sum(len(np.intersect1d(a, b[b >= 0])) for a, b in zip(truth, ids))
+        report['ivf'].append({
+            'n_probe': n_probe,
+            'recall': round(hits / truth.size, 4),
+            'ms_per_query': round(ms, 4),
+        })
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Hadith embedding search and IVF recall/latency report')
+    parser.add_argument('--embeddings', default='hadith_embaddings.npy')
+    parser.add_argument('--data', default=None, help='hadith_table directory or cleaned_hadith_data.csv, only needed for row lookups')
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=200, help='Number of sampled queries for the report')
+    parser.add_argument('--n-lists', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    engine = HadithSearchEngine.load(args.embeddings, args.data)
+    engine.build_ivf(n_lists=args.n_lists)
+    report = recall_latency_report(engine, sample_queries(engine.vectors, args.queries), args.k)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pytest
+
+from hadith_embed import EmbeddingStore, HashingEncoder, SentenceTransformerEncoder, embed_corpus
+
+TEXTS = [f'narrated abu huraira {i}' for i in range(10)]
+
+
+def build_store(path):
+    encoder = HashingEncoder(16)
+    store = EmbeddingStore(str(path), encoder.dim, encoder_name=encoder.name)
+    hashes, _ = embed_corpus(TEXTS, encoder, store, batch_size=4)
+    return encoder, store, hashes
+
+
+def test_partial_vector_tail_is_trimmed(tmp_path):
+    encoder, store, hashes = build_store(tmp_path)
+    with open(store.vectors_path, 'ab') as f:
+        f.write(b'\x00' * (store.row_bytes // 2))
+
+    reopened = EmbeddingStore(str(tmp_path), encoder.dim)
+    assert len(reopened) == len(TEXTS)
+    assert os.path.getsize(reopened.vectors_path) == len(TEXTS) * reopened.row_bytes
+    assert np.allclose(reopened.get(hashes), encoder.encode(TEXTS))
+
+
+def test_hash_without_vector_is_dropped_and_reencoded(tmp_path):
+    encoder, store, hashes = build_store(tmp_path)
+    # Interrupted between the two writes of append(): the last vector is cut off
+    with open(store.vectors_path, 'r+b') as f:
+        f.truncate((len(TEXTS) - 1) * store.row_bytes)
+    with open(store.hashes_path, 'a') as f:
+        f.write('deadbeef')  # half-written line without a newline
+
+    reopened = EmbeddingStore(str(tmp_path), encoder.dim)
+    assert len(reopened) == len(TEXTS) - 1
+    assert hashes[-1] not in reopened
+
+    _, stats = embed_corpus(TEXTS, encoder, reopened)
+    assert stats['encoded'] == 1
+    assert len(EmbeddingStore(str(tmp_path), encoder.dim)) == len(TEXTS)
+
+
+def test_dtype_mismatch_raises(tmp_path):
+    build_store(tmp_path)
+    with pytest.raises(ValueError):
+        EmbeddingStore(str(tmp_path), 16, dtype='float16')
+
+
+def test_encoder_names_compare_case_insensitively(tmp_path):
+    EmbeddingStore(str(tmp_path), 16, encoder_name='sentence-transformers/all-MiniLm-L6-v2')
+    EmbeddingStore(str(tmp_path), 16, encoder_name='sentence-transformers/all-MiniLM-L6-v2')
+    with pytest.raises(ValueError):
+        EmbeddingStore(str(tmp_path), 16, encoder_name='sentence-transformers/all-mpnet-base-v2')
+
+
+def test_injected_model_needs_a_name():
+    class Model:
+        def get_sentence_embedding_dimension(self):
+            return 16
+
+    with pytest.raises(ValueError):
+        SentenceTransformerEncoder(model=Model())
+    assert SentenceTransformerEncoder('custom-model', model=Model()).name == 'custom-model'
@@ -0,0 +1,50 @@
+import numpy as np
+
+from hadith_embed import HashingEncoder
+from hadith_hybrid import BM25Index, HybridRetriever
+from hadith_search import HadithSearchEngine
+
+DOCS = [f'patience in hardship is rewarded {i}' for i in range(50)] + ['narrated ikrimah']
+
+
+def build_retriever(prefilter=True, candidate_k=20):
+    encoder = HashingEncoder(32)
+    engine = HadithSearchEngine(encoder.encode(DOCS))
+    return HybridRetriever(engine, BM25Index().build(DOCS), encoder, candidate_k=candidate_k, prefilter=prefilter)
+
+
+def test_few_lexical_matches_keep_vector_candidates():
+    hits = build_retriever().search('ikrimah said', k=10)
+    assert len(hits) == 10
+    assert hits[0]['id'] == 50
+    assert [h['id'] for h in hits] == [h['id'] for h in build_retriever(prefilter=False).search('ikrimah said', k=10)]
+
+
+def test_prefilter_keeps_lexical_candidates_only_when_there_are_enough():
+    retriever = build_retriever(candidate_k=20)
+    ids, _, _, lexical = retriever.search_ids('patience hardship', k=10)
+    assert len(ids) == 10
+    assert (lexical > 0).all()
+
+
+def test_cached_results_are_copies():
+    retriever = build_retriever()
+    hits = retriever.search('narrated ikrimah', k=3)
+    hits[0]['score'] = -1.0
+    hits.pop()
+
+    again = retriever.search('narrated ikrimah', k=3)
+    assert len(again) == 3
+    assert again[0]['score'] != -1.0
+    assert retriever.cache_info()['results']['hits'] == 1
+
+
+def test_bm25_save_load_round_trip(tmp_path):
+    index = BM25Index(k1=1.2, b=0.6).build(DOCS)
+    for path in (tmp_path / 'bm25', tmp_path / 'bm25.npz'):
+        index.save(str(path))
+        loaded = BM25Index.load(str(path))
+        assert (loaded.k1, loaded.b) == (1.2, 0.6)
+        assert loaded.vocab == index.vocab
+        assert np.allclose(loaded.scores('ikrimah patience'), index.scores('ikrimah patience'))
+        assert loaded.top('ikrimah', 5)[0].tolist() == [50]
@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from hadith_ingest import COLUMNS, HadithTable, ingest
+
+
+def write_chapter(path, n, chapter=1):
+    rows = {col: [f'{col} {i}' for i in range(n)] for col in COLUMNS}
+    rows['Chapter_Number'] = [chapter] * n
+    rows['Section_Number'] = [1] * n
+    rows['Hadith_Number'] = list(range(1, n + 1))
+    rows['English_Hadith'] = [f'Narrated Abu Huraira: hadith {i}!' for i in range(n)]
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(path, index=False)
+
+
+def test_truncate_to_meta_drops_partial_append(tmp_path):
+    corpus = tmp_path / 'corpus'
+    corpus.mkdir()
+    write_chapter(corpus / 'chapter1.csv', 5)
+    out = str(tmp_path / 'table')
+    table, _ = ingest([str(corpus / 'chapter1.csv')], out, workers=1)
+
+    # Interrupted append: bytes reached the column files but meta.json was never rewritten
+    with open(os.path.join(out, 'Hadith_Number.i64'), 'ab') as f:
+        f.write(np.arange(3, dtype=np.int64).tobytes()[:20])
+    with open(os.path.join(out, 'English_Hadith.txt'), 'ab') as f:
+        f.write(b'half written')
+    with open(os.path.join(out, 'English_Hadith.off'), 'ab') as f:
+        f.write(b'\x01\x02\x03')
+
+    reopened = HadithTable(out)
+    reopened.truncate_to_meta()
+    assert len(reopened) == 5
+    assert os.path.getsize(os.path.join(out, 'Hadith_Number.i64')) == 5 * 8
+    assert os.path.getsize(os.path.join(out, 'English_Hadith.off')) == 5 * 8
+    assert list(reopened.column('Hadith_Number')) == [1, 2, 3, 4, 5]
+    assert reopened.row(4)['English_Hadith'] == 'Narrated Abu Huraira: hadith 4!'
+
+    # A later ingest continues cleanly after the recovered rows
+    write_chapter(corpus / 'chapter2.csv', 3, chapter=2)
+    table, stats = ingest([str(corpus / 'chapter1.csv'), str(corpus / 'chapter2.csv')], out, workers=1)
+    assert stats['rows_added'] == 3
+    assert list(table.column('row_id')) == list(range(8))
+    assert table.row(5)['Chapter_Number'] == 2
+
+
+def test_second_ingest_without_root_keeps_existing_rows(tmp_path):
+    first, second = tmp_path / 'bukhari', tmp_path / 'muslim'
+    first.mkdir()
+    second.mkdir()
+    for i in range(3):
+        write_chapter(first / f'chapter{i}.csv', 4)
+        write_chapter(second / f'chapter{i}.csv', 4)
+    out = str(tmp_path / 'table')
+
+    ingest([str(first / f'chapter{i}.csv') for i in range(3)], out, workers=1)
+    files = sorted(str(p) for p in tmp_path.glob('*/*.csv'))
+    table, stats = ingest(files, out, workers=1)
+
+    assert stats['files_skipped'] == 3
+    assert stats['rows_added'] == 12
+    assert len(table) == 24
+    assert HadithTable(out).meta['root'] == str(first)
+
+
+def test_bad_numeric_values_are_counted(tmp_path):
+    path = tmp_path / 'chapter1.csv'
+    write_chapter(path, 4)
+    df = pd.read_csv(path, dtype=str)
+    df.loc[1, 'Hadith_Number'] = '12a'
+    df.to_csv(path, index=False)
+
+    table, stats = ingest([str(path)], str(tmp_path / 'table'), workers=1)
+    assert stats['numeric_values_coerced']['Hadith_Number'] == 1
+    assert stats['numeric_values_coerced']['Chapter_Number'] == 0
+    assert table.row(1)['Hadith_Number'] == -1
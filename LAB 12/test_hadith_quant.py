@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from hadith_quant import ProductQuantizer, QuantizedIndex, ScalarQuantizer
+from hadith_search import HadithSearchEngine, normalize_rows
+
+
+@pytest.fixture
+def embeddings_path(tmp_path):
+    path = str(tmp_path / 'embeddings.npy')
+    np.save(path, np.random.default_rng(0).normal(size=(600, 32)).astype(np.float32))
+    return path
+
+
+@pytest.mark.parametrize('kind, params', [('int8', {}), ('pq', {'m': 8, 'ksub': 16})])
+def test_save_load_round_trip(tmp_path, embeddings_path, kind, params):
+    index = QuantizedIndex.build(embeddings_path, kind, **params)
+    queries = normalize_rows(np.load(embeddings_path)[:5])
+    index.save(str(tmp_path / 'index'))
+    loaded = QuantizedIndex.load(str(tmp_path / 'index'))
+
+    assert type(loaded.quantizer) is type(index.quantizer)
+    assert np.array_equal(loaded.codes, index.codes)
+    assert loaded.memory_bytes() == index.memory_bytes()
+    for rerank in (0, 50):
+        ids, scores = index.search_ids(queries, 10, rerank)
+        loaded_ids, loaded_scores = loaded.search_ids(queries, 10, rerank)
+        assert np.array_equal(ids, loaded_ids)
+        assert np.allclose(scores, loaded_scores)
+
+
+def test_rerank_returns_exact_scores(embeddings_path):
+    index = QuantizedIndex.build(embeddings_path, 'pq', m=8, ksub=16)
+    engine = HadithSearchEngine(np.load(embeddings_path))
+    queries = normalize_rows(np.load(embeddings_path)[:5])
+
+    approx_ids, approx_scores = index.search_ids(queries, 10, rerank=0)
+    ids, scores = index.search_ids(queries, 10, rerank=600)
+    exact_ids, exact_scores = engine.search_ids(queries, 10)
+    assert approx_ids.shape == ids.shape == (5, 10)
+    # Re-ranking every row gives exactly the float32 results; compressed scores only approximate them
+    assert np.array_equal(ids, exact_ids)
+    assert np.allclose(scores, exact_scores, atol=1e-5)
+    assert not np.allclose(approx_scores, exact_scores, atol=1e-5)
+
+
+def test_scalar_scores_match_decoded_vectors():
+    x = normalize_rows(np.random.default_rng(1).normal(size=(300, 16)))
+    quantizer = ScalarQuantizer().train(x)
+    codes = quantizer.encode(x)
+    queries = x[:4]
+    expected = queries @ quantizer.decode(codes).T
+    assert np.allclose(quantizer.scores(codes, queries, chunk_size=64), expected, atol=1e-5)
+
+
+def test_pq_m_must_divide_dimension():
+    with pytest.raises(ValueError, match='not divisible'):
+        ProductQuantizer(m=5).train(np.zeros((10, 32), dtype=np.float32))
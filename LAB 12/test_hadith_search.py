@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+
+from hadith_search import HadithSearchEngine, load_normalized, normalize_rows, top_k
+
+
+def random_vectors(n, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def test_blockwise_exact_matches_single_block():
+    vectors, queries = random_vectors(1000), random_vectors(7, seed=1)
+    single = HadithSearchEngine(vectors)
+    blocked = HadithSearchEngine(vectors, block_size=128)
+
+    ids, scores = single.search_ids(queries, k=10)
+    blocked_ids, blocked_scores = blocked.search_ids(queries, k=10)
+    assert np.array_equal(ids, blocked_ids)
+    assert np.allclose(scores, blocked_scores)
+
+
+def test_ivf_probing_every_list_is_exact():
+    engine = HadithSearchEngine(random_vectors(500), block_size=64)
+    engine.build_ivf(n_lists=8)
+    queries = random_vectors(5, seed=2)
+
+    exact_ids, exact_scores = engine.search_ids(queries, k=10)
+    ivf_ids, ivf_scores = engine.search_ids(queries, k=10, mode='ivf', n_probe=8)
+    assert np.array_equal(exact_ids, ivf_ids)
+    assert np.allclose(exact_scores, ivf_scores)
+
+
+def test_top_k_edge_cases():
+    scores = np.array([[0.1, 0.9, 0.5], [0.3, 0.2, 0.7]], dtype=np.float32)
+
+    ids, best = top_k(scores, 10)
+    assert ids.tolist() == [[1, 2, 0], [2, 0, 1]]
+    assert np.allclose(best, [[0.9, 0.5, 0.1], [0.7, 0.3, 0.2]])
+
+    ids, best = top_k(scores, 0)
+    assert ids.shape == (2, 0) and best.shape == (2, 0)
+    assert ids.dtype == np.int64
+
+
+def test_normalized_cache_is_rebuilt_when_source_is_newer(tmp_path):
+    path = str(tmp_path / 'embeddings.npy')
+    first = random_vectors(20)
+    np.save(path, first)
+    assert np.allclose(load_normalized(path), normalize_rows(first))
+    norm_mtime = os.path.getmtime(str(tmp_path / 'embeddings.norm.npy'))
+
+    second = random_vectors(20, seed=3)
+    np.save(path, second)
+    os.utime(path, (norm_mtime + 10, norm_mtime + 10))
+    assert np.allclose(load_normalized(path), normalize_rows(second))
@@ -1,72 +1,98 @@
+import os
 import cv2
 import numpy as np
 import time
-import screen_brightness_control as sbc
 
 # MediaPipe 0.10+ imports
-from mediapipe.tasks.python import vision
+import mediapipe as mp
+from mediapipe.tasks.python import BaseOptions, vision
 from mediapipe.tasks.python.vision import HandLandmarker, HandLandmarkerOptions, HandLandmarkerResult
 
+# Hand landmark model bundle (download it next to this script)
+MODEL_URL = 'https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/1/hand_landmarker.task'
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hand_landmarker.task')
 
-options = HandLandmarkerOptions(
-    model_path=HandLandmarkerOptions.DEFAULT_MODEL_PATH,
-    num_hands=1
-)
-hand_landmarker = HandLandmarker.create_from_options(options)
-
-cap = cv2.VideoCapture(0)
-prev_brightness = sbc.get_brightness()  # current brightness
 smoothness = 5  # higher = smoother
 
+def create_hand_landmarker(model_path=DEFAULT_MODEL_PATH, running_mode=vision.RunningMode.IMAGE):
+    """Create the MediaPipe hand landmarker used by the live loop and the replay benchmark."""
+    options = HandLandmarkerOptions(
+        base_options=BaseOptions(model_asset_path=model_path),
+        running_mode=running_mode,
+        num_hands=1
+    )
+    return HandLandmarker.create_from_options(options)
+
+def to_mp_image(img_rgb):
+    """Wrap an RGB numpy frame as the mp.Image the landmarker expects."""
+    return mp.Image(image_format=mp.ImageFormat.SRGB, data=img_rgb)
+
 def get_landmark_coords(landmark, img_w, img_h):
     """Convert normalized landmark to pixel coordinates."""
     return int(landmark.x * img_w), int(landmark.y * img_h)
 
-while True:
-    success, img = cap.read()
-    if not success:
-        continue
+def update_brightness(handLms, img_w, img_h, prev_brightness, controller):
+    """Map the thumb/index distance to a smoothed brightness and apply it through controller."""
+    # Thumb tip = 4, Index tip = 8
+    x1, y1 = get_landmark_coords(handLms[4], img_w, img_h)
+    x2, y2 = get_landmark_coords(handLms[8], img_w, img_h)
+
+    # Distance between fingers
+    dist = np.hypot(x2 - x1, y2 - y1)
+
+    # Map distance to brightness
+    brightness = np.interp(dist, [20, 200], [0, 100])
+
+    # Smooth brightness to avoid jumps
+    brightness = prev_brightness + (brightness - prev_brightness) / smoothness
+    controller.set_brightness(int(brightness))
+    return brightness, (x1, y1), (x2, y2)
+
+def draw_overlay(img, brightness, p1, p2):
+    """Draw the brightness bar and the thumb/index line on the frame."""
+    # Draw brightness bar
+    cv2.rectangle(img, (50, 150), (85, 400), (0,255,0), 2)
+    cv2.rectangle(img, (50, int(400 - (brightness*2.5))), (85, 400), (0,255,0), -1)
+    cv2.putText(img, f'{int(brightness)}%', (40, 430),
+                cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0), 2)
 
-    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    # Draw line & circles between thumb and index
+    cv2.line(img, p1, p2, (255,0,0), 3)
+    cv2.circle(img, p1, 8, (0,0,255), cv2.FILLED)
+    cv2.circle(img, p2, 8, (0,0,255), cv2.FILLED)
 
-    # Detect hands
-    result: HandLandmarkerResult = hand_landmarker.detect(img_rgb)
+def main():
+    import screen_brightness_control as sbc
 
-    if result.hand_landmarks:
-        handLms = result.hand_landmarks[0]  # first hand
-        h, w, _ = img.shape
+    hand_landmarker = create_hand_landmarker()
+    cap = cv2.VideoCapture(0)
+    prev_brightness = sbc.get_brightness()  # current brightness
 
-        # Thumb tip = 4, Index tip = 8
-        x1, y1 = get_landmark_coords(handLms[4], w, h)
-        x2, y2 = get_landmark_coords(handLms[8], w, h)
+    while True:
+        success, img = cap.read()
+        if not success:
+            continue
 
-        # Distance between fingers
-        dist = np.hypot(x2 - x1, y2 - y1)
+        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
 
-        # Map distance to brightness
-        brightness = np.interp(dist, [20, 200], [0, 100])
+        # Detect hands
+        result: HandLandmarkerResult = hand_landmarker.detect(to_mp_image(img_rgb))
 
-        # Smooth brightness to avoid jumps
-        brightness = prev_brightness + (brightness - prev_brightness) / smoothness
-        sbc.set_brightness(int(brightness))
-        prev_brightness = brightness
+        if result.hand_landmarks:
+            handLms = result.hand_landmarks[0]  # first hand
+            h, w, _ = img.shape
 
-        # Draw brightness bar
-        cv2.rectangle(img, (50, 150), (85, 400), (0,255,0), 2)
-        cv2.rectangle(img, (50, int(400 - (brightness*2.5))), (85, 400), (0,255,0), -1)
-        cv2.putText(img, f'{int(brightness)}%', (40, 430),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0), 2)
+            brightness, p1, p2 = update_brightness(handLms, w, h, prev_brightness, sbc)
+            prev_brightness = brightness
+            draw_overlay(img, brightness, p1, p2)
 
-        # Draw line & circles between thumb and index
-        cv2.line(img, (x1,y1), (x2,y2), (255,0,0), 3)
-        cv2.circle(img, (x1,y1), 8, (0,0,255), cv2.FILLED)
-        cv2.circle(img, (x2,y2), 8, (0,0,255), cv2.FILLED)
+        cv2.imshow("Brightness Control", img)
 
-    cv2.imshow("Brightness Control", img)
-    
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            break
 
-cap.release()
-cv2.destroyAllWindows()
+    cap.release()
+    cv2.destroyAllWindows()
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Headless replay benchmark for the brightness gesture controller.
+
+Reads frames from a recorded video instead of the webcam, runs the same
+landmark + brightness pipeline as brightness_control.py without opening any
+window, and writes per-stage latency plus end-to-end FPS as JSON.
+
+Usage:
+    python replay_benchmark.py --video "../LAB 14/project.mp4" --model hand_landmarker.task --output results.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from mediapipe.tasks.python import vision
+
+from brightness_control import DEFAULT_MODEL_PATH, MODEL_URL, create_hand_landmarker, draw_overlay, to_mp_image, update_brightness
+
+STAGES = ['decode', 'convert', 'landmark', 'actuation']
+DEFAULT_VIDEO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'LAB 14', 'project.mp4')
+
+
+class RecordingBrightness:
+    """Stand-in for screen_brightness_control that records calls instead of touching the display."""
+
+    def __init__(self, initial=50):
+        self.current = initial
+        self.calls = []
+
+    def get_brightness(self):
+        return self.current
+
+    def set_brightness(self, value):
+        self.current = value
+        self.calls.append(value)
+
+
+def summarize(samples_ms):
+    """Return mean/percentile statistics (milliseconds) for a list of samples."""
+    if not samples_ms:
+        return {'count': 0}
+    arr = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        'count': int(arr.size),
+        'mean_ms': round(float(arr.mean()), 4),
+        'p50_ms': round(float(np.percentile(arr, 50)), 4),
+        'p95_ms': round(float(np.percentile(arr, 95)), 4),
+        'p99_ms': round(float(np.percentile(arr, 99)), 4),
+        'max_ms': round(float(arr.max()), 4),
+    }
+
+
+def run_replay(video_path, max_frames=None, warmup=10, model_path=DEFAULT_MODEL_PATH, running_mode='image',
+               hand_landmarker=None, controller=None):
+    """Replay video_path through the gesture pipeline and return a JSON-serializable report.
+
+    running_mode 'image' runs independent detect calls exactly like the live loop;
+    'video' uses detect_for_video (landmark tracking across frames), which the
+    live loop does not, so its numbers are not comparable with 'image'.
+    """
+    if running_mode not in ('video', 'image'):
+        raise ValueError(f"Unknown running mode '{running_mode}', expected 'video' or 'image'")
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f'Could not open video: {video_path}')
+
+    if hand_landmarker is None:
+        if not os.path.exists(model_path):
+            cap.release()
+            raise FileNotFoundError(f'Hand landmarker model not found at {model_path}; download it from {MODEL_URL}')
+        mode = vision.RunningMode.VIDEO if running_mode == 'video' else vision.RunningMode.IMAGE
+        hand_landmarker = create_hand_landmarker(model_path, mode)
+    if controller is None:
+        controller = RecordingBrightness()
+
+    video_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    prev_brightness = controller.get_brightness()
+    timings = {stage: [] for stage in STAGES}
+    frame_times = []
+    frames = 0
+    hands_detected = 0
+    calls_before = len(controller.calls)  # set_brightness calls made before measuring started
+    clock = time.perf_counter
+
+    try:
+        while max_frames is None or frames < max_frames + warmup:
+            t0 = clock()
+            success, img = cap.read()
+            t1 = clock()
+            if not success:
+                break
+
+            mp_image = to_mp_image(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+            t2 = clock()
+
+            if running_mode == 'video':
+                # Timestamps must increase monotonically; derive them from the frame index
+                result = hand_landmarker.detect_for_video(mp_image, int(frames * 1000 / video_fps))
+            else:
+                result = hand_landmarker.detect(mp_image)
+            t3 = clock()
+
+            # Actuation covers everything the live loop does per frame after detection
+            if result.hand_landmarks:
+                h, w, _ = img.shape
+                prev_brightness, p1, p2 = update_brightness(result.hand_landmarks[0], w, h, prev_brightness, controller)
+                draw_overlay(img, prev_brightness, p1, p2)
+            t4 = clock()
+
+            frames += 1
+            if frames <= warmup:
+                calls_before = len(controller.calls)
+                continue
+            if result.hand_landmarks:
+                hands_detected += 1
+            timings['decode'].append((t1 - t0) * 1000)
+            timings['convert'].append((t2 - t1) * 1000)
+            timings['landmark'].append((t3 - t2) * 1000)
+            timings['actuation'].append((t4 - t3) * 1000)
+            frame_times.append((t4 - t0) * 1000)
+    finally:
+        cap.release()
+
+    measured = len(frame_times)
+    total_s = sum(frame_times) / 1000
+    return {
+        'video': os.path.abspath(video_path),
+        'python': platform.python_version(),
+        'opencv': cv2.__version__,
+        'warmup_frames': min(warmup, frames),
+        'measured_frames': measured,
+        'hands_detected': hands_detected,
+        'brightness_updates': len(controller.calls) - calls_before,
+        'running_mode': running_mode,
+        'stages': {stage: summarize(timings[stage]) for stage in STAGES},
+        'frame': summarize(frame_times),
+        'fps': round(measured / total_s, 3) if total_s > 0 else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Headless replay benchmark for brightness_control.py')
+    parser.add_argument('--video', default=DEFAULT_VIDEO, help='Video file to replay')
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help='Path to hand_landmarker.task')
+    parser.add_argument('--running-mode', choices=['image', 'video'], default='image',
+                        help="'image' matches the live loop; 'video' tracks landmarks across frames")
+    parser.add_argument('--max-frames', type=int, default=None, help='Stop after this many measured frames')
+    parser.add_argument('--warmup', type=int, default=10, help='Frames to run before measuring')
+    parser.add_argument('--output', default=None, help='Write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+
+    report = run_replay(args.video, max_frames=args.max_frames, warmup=args.warmup,
+                        model_path=args.model, running_mode=args.running_mode)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
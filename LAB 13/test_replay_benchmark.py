@@ -0,0 +1,53 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from replay_benchmark import DEFAULT_VIDEO, STAGES, RecordingBrightness, run_replay
+
+pytestmark = pytest.mark.skipif(not os.path.exists(DEFAULT_VIDEO), reason='LAB 14/project.mp4 not available')
+
+
+class StubLandmarker:
+    """Finds the same hand on every other frame."""
+
+    def __init__(self):
+        self.calls = 0
+        hand = [SimpleNamespace(x=0.5, y=0.5) for _ in range(21)]
+        hand[8] = SimpleNamespace(x=0.5 + 100 / 640, y=0.5)
+        self.hand = hand
+
+    def detect(self, mp_image):
+        self.calls += 1
+        return SimpleNamespace(hand_landmarks=[self.hand] if self.calls % 2 else [])
+
+
+def test_warmup_frames_are_excluded():
+    landmarker, controller = StubLandmarker(), RecordingBrightness()
+    report = run_replay(DEFAULT_VIDEO, max_frames=20, warmup=5, hand_landmarker=landmarker, controller=controller)
+
+    assert landmarker.calls == 25
+    assert report['warmup_frames'] == 5
+    assert report['measured_frames'] == 20
+    assert report['frame']['count'] == 20
+    assert all(report['stages'][stage]['count'] == 20 for stage in STAGES)
+    # Frames 6..25 were measured; the odd-numbered ones had a hand
+    assert report['hands_detected'] == 10
+    assert report['brightness_updates'] == 10
+    assert len(controller.calls) == 13
+
+
+def test_report_schema():
+    report = run_replay(DEFAULT_VIDEO, max_frames=3, warmup=0, hand_landmarker=StubLandmarker())
+
+    assert set(report) == {'video', 'python', 'opencv', 'warmup_frames', 'measured_frames', 'hands_detected',
+                           'brightness_updates', 'running_mode', 'stages', 'frame', 'fps'}
+    assert report['running_mode'] == 'image'
+    assert set(report['stages']) == set(STAGES)
+    assert set(report['frame']) == {'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}
+    assert report['fps'] > 0
+
+
+def test_unknown_running_mode():
+    with pytest.raises(ValueError):
+        run_replay(DEFAULT_VIDEO, running_mode='live', hand_landmarker=StubLandmarker())
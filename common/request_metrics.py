@@ -0,0 +1,202 @@
+"""
+Request metrics for the Flask apps, exposed in Prometheus text format on /metrics.
+
+Records per-route latency histograms, in-flight request gauges, status-code
+counters and per-stage timings. Stages split each request into:
+    routing   WSGI entry until the first before_request hook (context push, URL matching)
+    render    time spent rendering templates (first-time template compilation counts as handler)
+    <name>    any block wrapped in metrics.stage(name), e.g. an upstream API call or cache lookup
+    handler   whatever is left of the request after the stages above
+
+Usage:
+    from request_metrics import RequestMetrics
+    metrics = RequestMetrics(app)
+
+    with metrics.stage('openweather'):
+        response = requests.get(...)
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import Response, g, request, template_rendered, before_render_template
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+START_KEY = 'request_metrics.start'
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestMetrics:
+    def __init__(self, app=None, buckets=DEFAULT_BUCKETS, endpoint='/metrics', prefix='flask'):
+        self.buckets = tuple(sorted(buckets))
+        self.endpoint = endpoint
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.latency = {}      # (route, method) -> Histogram
+        self.stages = {}       # (route, stage) -> Histogram
+        self.responses = {}    # (route, method, status) -> int
+        self.in_flight = {}    # route -> int
+        self.collected = {}    # name -> (help, callable returning a number or {label: value}, label name, type)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.wsgi_app = self._wrap_wsgi(app.wsgi_app)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        before_render_template.connect(self._render_started, app)
+        template_rendered.connect(self._render_finished, app)
+        app.add_url_rule(self.endpoint, 'metrics', self.metrics_view)
+        app.extensions['request_metrics'] = self
+
+    def register_gauge(self, name, help_text, fn, label='key'):
+        """Expose fn() as a gauge; fn may return a number or a dict of {label value: number}."""
+        self.collected[name] = (help_text, fn, label, 'gauge')
+
+    def register_counter(self, name, help_text, fn, label='key'):
+        """Expose fn() as a counter; fn returns running totals that only ever increase."""
+        if not name.endswith('_total'):
+            raise ValueError(f"Counter name '{name}' must end in _total")
+        self.collected[name] = (help_text, fn, label, 'counter')
+
+    @staticmethod
+    def _wrap_wsgi(wsgi_app):
+        def wsgi(environ, start_response):
+            environ[START_KEY] = time.perf_counter()
+            return wsgi_app(environ, start_response)
+        return wsgi
+
+    @staticmethod
+    def _route():
+        return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+    def _observe(self, table, key, value):
+        hist = table.get(key)
+        if hist is None:
+            hist = table.setdefault(key, Histogram(self.buckets))
+        hist.observe(value)
+
+    def _before_request(self):
+        now = time.perf_counter()
+        route = self._route()
+        g._metrics_route = route
+        g._metrics_start = request.environ.get(START_KEY, now)
+        g._metrics_stages = {'routing': now - g._metrics_start}
+        g._metrics_status = 500
+        with self.lock:
+            self.in_flight[route] = self.in_flight.get(route, 0) + 1
+
+    def _after_request(self, response):
+        g._metrics_status = response.status_code
+        return response
+
+    def _teardown_request(self, exc):
+        start = g.pop('_metrics_start', None)
+        if start is None:
+            return
+        total = time.perf_counter() - start
+        route = g.pop('_metrics_route')
+        stages = g.pop('_metrics_stages')
+        stages['handler'] = max(total - sum(stages.values()), 0.0)
+        status = g.pop('_metrics_status')
+        method = request.method
+        with self.lock:
+            self.in_flight[route] -= 1
+            self._observe(self.latency, (route, method), total)
+            for name, seconds in stages.items():
+                self._observe(self.stages, (route, name), seconds)
+            key = (route, method, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+
+    def _render_started(self, sender, template, context, **extra):
+        g._metrics_render_start = time.perf_counter()
+
+    def _render_finished(self, sender, template, context, **extra):
+        start = g.pop('_metrics_render_start', None)
+        if start is not None:
+            self._add_stage('render', time.perf_counter() - start)
+
+    def _add_stage(self, name, seconds):
+        stages = g.get('_metrics_stages')
+        if stages is not None:
+            stages[name] = stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block (upstream call, cache lookup, ...) as a named stage of the current request."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add_stage(name, time.perf_counter() - start)
+
+    def render(self):
+        """Current metrics in Prometheus text exposition format."""
+        p = self.prefix
+        lines = []
+        with self.lock:
+            lines += self._histogram_lines(f'{p}_request_duration_seconds', 'Request latency by route',
+                                           self.latency, ('route', 'method'))
+            lines += self._histogram_lines(f'{p}_request_stage_seconds', 'Time spent per request stage',
+                                           self.stages, ('route', 'stage'))
+            lines.append(f'# HELP {p}_requests_in_flight Requests currently being handled')
+            lines.append(f'# TYPE {p}_requests_in_flight gauge')
+            for route, value in sorted(self.in_flight.items()):
+                lines.append(f'{p}_requests_in_flight{_labels(route=route)} {value}')
+            lines.append(f'# HELP {p}_responses_total Responses by status code')
+            lines.append(f'# TYPE {p}_responses_total counter')
+            for (route, method, status), value in sorted(self.responses.items()):
+                lines.append(f'{p}_responses_total{_labels(route=route, method=method, status=status)} {value}')
+
+        for name, (help_text, fn, label_name, kind) in sorted(self.collected.items()):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            value = fn()
+            if isinstance(value, dict):
+                for label, v in sorted(value.items()):
+                    lines.append(f'{name}{_labels(**{label_name: label})} {v}')
+            else:
+                lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def _histogram_lines(self, name, help_text, table, label_names):
+        lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for key, hist in sorted(table.items()):
+            labels = dict(zip(label_names, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), hist.counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{_labels(**labels, le=le)} {cumulative}')
+            lines.append(f'{name}_sum{_labels(**labels)} {hist.sum}')
+            lines.append(f'{name}_count{_labels(**labels)} {hist.count}')
+        return lines
+
+    def metrics_view(self):
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
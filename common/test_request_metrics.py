@@ -0,0 +1,76 @@
+import re
+
+import pytest
+from flask import Flask, render_template_string
+
+from request_metrics import RequestMetrics
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    metrics = RequestMetrics(app, buckets=(0.01, 0.1, 1.0))
+
+    @app.route('/hello/<name>')
+    def hello(name):
+        with metrics.stage('lookup'):
+            greeting = f'hello {name}'
+        return render_template_string('<p>{{ greeting }}</p>', greeting=greeting)
+
+    @app.route('/boom')
+    def boom():
+        raise RuntimeError('boom')
+
+    return app
+
+
+def samples(text):
+    """{series with labels: value} for every sample line of a metrics page."""
+    return {line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+            for line in text.splitlines() if line and not line.startswith('#')}
+
+
+def test_histogram_buckets_and_in_flight(app):
+    client = app.test_client()
+    for name in ('a', 'b', 'c'):
+        assert client.get(f'/hello/{name}').status_code == 200
+    values = samples(client.get('/metrics').get_data(as_text=True))
+
+    labels = 'route="/hello/<name>",method="GET"'
+    buckets = [values[f'flask_request_duration_seconds_bucket{{{labels},le="{le}"}}']
+               for le in ('0.01', '0.1', '1.0', '+Inf')]
+    assert buckets == sorted(buckets)
+    assert buckets[-1] == values[f'flask_request_duration_seconds_count{{{labels}}}'] == 3
+    assert values['flask_requests_in_flight{route="/hello/<name>"}'] == 0
+    assert values[f'flask_responses_total{{{labels},status="200"}}'] == 3
+
+
+def test_stages_are_recorded(app):
+    client = app.test_client()
+    client.get('/hello/a')
+    values = samples(client.get('/metrics').get_data(as_text=True))
+
+    for stage in ('routing', 'lookup', 'render', 'handler'):
+        assert values[f'flask_request_stage_seconds_count{{route="/hello/<name>",stage="{stage}"}}'] == 1
+
+
+def test_exception_is_counted_as_500(app):
+    client = app.test_client()
+    assert client.get('/boom').status_code == 500
+    values = samples(client.get('/metrics').get_data(as_text=True))
+
+    assert values['flask_responses_total{route="/boom",method="GET",status="500"}'] == 1
+    assert values['flask_requests_in_flight{route="/boom"}'] == 0
+
+
+def test_gauges_and_counters():
+    metrics = RequestMetrics(Flask(__name__))
+    metrics.register_gauge('queue_depth', 'Items waiting', lambda: 4)
+    metrics.register_counter('items_total', 'Items by kind', lambda: {'a': 1, 'b': 2}, label='kind')
+    with pytest.raises(ValueError):
+        metrics.register_counter('items', 'Missing suffix', lambda: 0)
+
+    text = metrics.render()
+    assert '# TYPE queue_depth gauge' in text
+    assert '# TYPE items_total counter' in text
+    assert re.search(r'^items_total\{kind="b"\} 2$', text, re.M)